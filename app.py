@@ -1,11 +1,20 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+import time
+import hashlib
+import os
 import logging
 import requests
 from flask_cors import CORS
-from modules.info_module import get_pokemon_info
-from modules.compare_module import compare_pokemons
-from modules.strategy_module import strategy_decision
-from modules.team_module import build_team
+from modules.info_module import get_pokemon_info_async
+from modules.compare_module import compare_pokemons_async, compare_many
+from modules.strategy_module import TEAM_ANALYSIS_LIMIT, analyze_team, find_counters, strategy_decision_async
+from modules.team_module import TEAM_BUILDER_MODES, build_team, iter_build_team
+from modules.roster_module import warm_roster_index
+from modules.classifier_module import classifier_status, preload_classifier
+from modules.data_module import cache_stats, dataset_version, snapshot_info, upstream_stats
+from modules.metrics_module import CONTENT_TYPE, REQUEST_LATENCY, current_route, render_metrics
+from modules.response_module import (COMPRESS_MIN_SIZE, COMPRESSIBLE_TYPES, compress, json_provider_class,
+                                     negotiate_encoding, parse_fields, shape)
 
 # Setup Logging
 logging.basicConfig(
@@ -21,12 +30,118 @@ logging.getLogger().addHandler(console)
 
 # Initialize Flask app
 app = Flask(__name__)
+# orjson when installed (see modules/response_module.py)
+app.json = json_provider_class()(app)
 CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
 
+# Build the /team candidate index up front instead of on the first request
+if os.environ.get("ROSTER_WARMUP", "0") == "1":
+    logging.info("Warming roster index...")
+    warm_roster_index()
+
+# Only loads the model when CLASSIFIER_MODE=eager (e.g. in a preloading gunicorn master)
+preload_classifier()
+
+# -- Metrics --
+
+@app.before_request
+def start_timer():
+    g.start_time = time.perf_counter()
+    # Stage timings recorded while serving this request are labelled with its route
+    # (including the body of streamed responses, so it is not reset on teardown)
+    current_route.set(request.url_rule.rule if request.url_rule else "unmatched")
+
+@app.after_request
+def record_latency(response):
+    # For streamed responses this is the time until the body starts streaming
+    if "start_time" in g:
+        REQUEST_LATENCY.observe(time.perf_counter() - g.start_time, route=current_route.get(),
+                                method=request.method, status=response.status_code)
+    return response
+
+# -- Response shaping and compression --
+# Any data route accepts ?compact=1 (flattened stats maps, no upstream URLs)
+# and ?fields=a,b (only those top-level fields). JSON bodies of at least
+# COMPRESS_MIN_SIZE bytes are gzip/brotli compressed when the client accepts it.
+
+def response_encoding():
+    return negotiate_encoding(request.accept_encodings)
+
+def representation():
+    """What, besides the resource, decides a response body: shaping options and content coding"""
+    return [request.args.get('compact', ''), request.args.get('fields', ''), response_encoding() or 'identity']
+
+def shaped(result):
+    compact_mode = request.args.get('compact', '').lower() in ('1', 'true', 'yes')
+    return shape(result, compact_mode, parse_fields(request.args.get('fields')))
+
+@app.after_request
+def compress_response(response):
+    if response.mimetype not in COMPRESSIBLE_TYPES or response.is_streamed or response.direct_passthrough:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = response_encoding()
+    if not encoding or response.status_code < 200 or response.status_code in (204, 304) \
+            or 'Content-Encoding' in response.headers:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+# -- HTTP caching --
+# GET variants of /info, /compare, /strategy, /counters and /team/analyze are
+# cacheable: their ETag is derived from the request (path, shaping options,
+# content coding) and the dataset version alone, so a matching
+# If-None-Match is answered with 304 before any lookup happens.
+
+HTTP_CACHE_MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", "86400"))
+# Bump when the body of a cacheable response changes shape
+RESPONSE_VERSION = "1"
+
+def response_etag(route, *args):
+    # Each content coding is its own representation, so it gets its own ETag
+    key = "\0".join([RESPONSE_VERSION, dataset_version(), route] + [a.lower().strip() for a in args]
+                    + representation())
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+def not_modified(etag):
+    """304 for a conditional request that already has this representation, else None"""
+    # Only an explicit ETag counts: the 304 is decided before the lookup, so
+    # "*" would also match resources that don't exist
+    etags = request.if_none_match
+    if not (etags.is_strong(etag) or etags.is_weak(etag)):
+        return None
+    response = Response(status=304)
+    response.vary.add('Accept-Encoding')
+    return cacheable(response, etag)
+
+def cacheable(response, etag):
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = HTTP_CACHE_MAX_AGE
+    return response
+
+def cached_json(result, etag):
+    """Cacheable JSON response; anything but a successful result object is an uncached 404"""
+    if not isinstance(result, dict) or 'error' in result:
+        response = jsonify(result if isinstance(result, dict) else {'error': str(result)})
+        response.status_code = 404
+        response.cache_control.no_store = True
+        return response
+    return cacheable(jsonify(shaped(result)), etag)
+
 # -- Routes --
+# Upstream-bound routes are async views (Flask[async]) so that /compare and
+# /strategy can fetch both Pokemon concurrently. Flask still runs each async
+# view to completion on its own event loop in the request's thread, so a
+# worker thread is held for the whole request either way; asgi.py's WsgiToAsgi
+# likewise runs the app in a thread pool.
 
 @app.route('/info', methods=['POST'])
-def info():
+async def info():
     data = request.get_json()  # ✅ FIXED: request (not requests)
     name = data.get('name')
     
@@ -36,11 +151,24 @@ def info():
         logging.warning("No Pokemon name provided in /info")
         return jsonify({'error': 'Please provide a pokemon name'}), 400
     
-    result = get_pokemon_info(name)
-    return jsonify(result)
+    result = await get_pokemon_info_async(name)
+    return jsonify(shaped(result))
+
+@app.route('/info/<name>', methods=['GET'])
+@app.route('/info', methods=['GET'])
+async def info_get(name=None):
+    name = name or request.args.get('name')
+    if not name:
+        return jsonify({'error': 'Please provide a pokemon name'}), 400
+    
+    etag = response_etag('info', name)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return cached_json(await get_pokemon_info_async(name), etag)
 
 @app.route('/compare', methods=['POST'])
-def compare():
+async def compare():
     data = request.get_json()  # ✅ FIXED: request (not requests)
     p1 = data.get('pokemon1')
     p2 = data.get('pokemon2')
@@ -51,11 +179,48 @@ def compare():
         logging.warning("Missing one or both Pokemon names in /compare")
         return jsonify({'error': 'Please provide both Pokemon names'}), 400
     
-    result = compare_pokemons(p1, p2)
-    return jsonify(result)
+    result = await compare_pokemons_async(p1, p2)
+    if 'error' in result:
+        return jsonify(result), 404
+    return jsonify(shaped(result))
+
+@app.route('/compare/<pokemon1>/<pokemon2>', methods=['GET'])
+@app.route('/compare', methods=['GET'])
+async def compare_get(pokemon1=None, pokemon2=None):
+    p1 = pokemon1 or request.args.get('pokemon1')
+    p2 = pokemon2 or request.args.get('pokemon2')
+    if not p1 or not p2:
+        return jsonify({'error': 'Please provide both Pokemon names'}), 400
+    
+    etag = response_etag('compare', p1, p2)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return cached_json(await compare_pokemons_async(p1, p2), etag)
+
+# Upper bound on Pokemon per /compare/batch request
+BATCH_COMPARE_LIMIT = int(os.environ.get("BATCH_COMPARE_LIMIT", "100"))
+
+@app.route('/compare/batch', methods=['POST'])
+def compare_batch():
+    data = request.get_json()
+    names = data.get('names') or []
+    
+    if not isinstance(names, list) or len(names) < 2 or not all(isinstance(n, str) for n in names):
+        logging.warning("No list of at least two Pokemon names in /compare/batch")
+        return jsonify({'error': 'Please provide a list of at least two Pokemon names'}), 400
+    
+    logging.info(f"/compare/batch called with {len(names)} Pokemon")
+    if len(names) > BATCH_COMPARE_LIMIT:
+        return jsonify({'error': f'Please provide at most {BATCH_COMPARE_LIMIT} Pokemon names'}), 400
+    
+    result = compare_many(names)
+    if 'error' in result:
+        return jsonify(result), 404
+    return jsonify(shaped(result))
 
 @app.route('/strategy', methods=['POST'])
-def strategy():
+async def strategy():
     data = request.get_json()  # ✅ FIXED: request (not requests)
     name1 = data.get('name1')
     name2 = data.get('name2')
@@ -66,24 +231,170 @@ def strategy():
         logging.warning("No Pokemon name provided in /strategy")
         return jsonify({'error': 'Please provide a Pokemon name'}), 400
     
-    result = strategy_decision(name1,name2)
-    return jsonify(result)
+    result = await strategy_decision_async(name1, name2)
+    return jsonify(shaped(result))
+
+@app.route('/strategy/<name1>/<name2>', methods=['GET'])
+@app.route('/strategy', methods=['GET'])
+async def strategy_get(name1=None, name2=None):
+    name1 = name1 or request.args.get('name1')
+    name2 = name2 or request.args.get('name2')
+    if not name1 or not name2:
+        return jsonify({'error': 'Please provide a Pokemon name'}), 400
+    
+    etag = response_etag('strategy', name1, name2)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return cached_json(await strategy_decision_async(name1, name2), etag)
 
 @app.route('/team', methods=['POST'])
 def team():
     data = request.get_json()  # ✅ FIXED: request (not requests)
     description = data.get('description', '')
+    mode = data.get('mode')
     
     logging.info(f"/team called with description: {description}")
     
     if not description:
         logging.warning("No description provided in /team")
         return jsonify({'error': 'Please provide a team description'}), 400
+    if mode is not None and mode not in TEAM_BUILDER_MODES:
+        return jsonify({'error': f"mode must be one of: {', '.join(TEAM_BUILDER_MODES)}"}), 400
+    
+    team = build_team(description, team_size=6, mode=mode)
+    return jsonify(shaped(team))
+
+@app.route('/team/stream', methods=['POST'])
+def team_stream():
+    """
+    /team, streamed: parse result, roster loading progress and each member as
+    it is picked. NDJSON by default, Server-Sent Events if the client accepts
+    text/event-stream.
+    """
+    data = request.get_json()
+    description = data.get('description', '')
+    mode = data.get('mode')
+    
+    logging.info(f"/team/stream called with description: {description}")
+    
+    if not description:
+        logging.warning("No description provided in /team/stream")
+        return jsonify({'error': 'Please provide a team description'}), 400
+    if mode is not None and mode not in TEAM_BUILDER_MODES:
+        return jsonify({'error': f"mode must be one of: {', '.join(TEAM_BUILDER_MODES)}"}), 400
     
-    team = build_team(description, team_size=6)
-    return jsonify(team)
+    sse = request.accept_mimetypes.best_match(['application/x-ndjson', 'text/event-stream']) == 'text/event-stream'
+    
+    def generate():
+        try:
+            for event in iter_build_team(description, team_size=6, mode=mode):
+                if sse:
+                    yield f"event: {event['event']}\ndata: {app.json.dumps(event)}\n\n"
+                else:
+                    yield app.json.dumps(event) + "\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logging.error(f"/team/stream failed: {e}")
+            event = {"event": "error", "error": "Team building failed"}
+            yield f"event: error\ndata: {app.json.dumps(event)}\n\n" if sse else app.json.dumps(event) + "\n"
+    
+    mimetype = 'text/event-stream' if sse else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype,
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def counter_count(k):
+    """k as a positive int, or None if it isn't one"""
+    try:
+        k = int(k)
+    except (TypeError, ValueError):
+        return None
+    return k if k > 0 else None
+
+@app.route('/counters', methods=['POST'])
+def counters():
+    """Roster Pokemon that best counter the given one, best first"""
+    data = request.get_json()
+    name = data.get('name')
+    k = counter_count(data.get('k', 10))
+    
+    logging.info(f"/counters called with: {name}")
+    
+    if not name:
+        return jsonify({'error': 'Please provide a pokemon name'}), 400
+    if k is None:
+        return jsonify({'error': 'k must be a positive integer'}), 400
+    
+    result = find_counters(name, k)
+    if 'error' in result:
+        return jsonify(result), 404
+    return jsonify(shaped(result))
+
+@app.route('/counters/<name>', methods=['GET'])
+@app.route('/counters', methods=['GET'])
+def counters_get(name=None):
+    name = name or request.args.get('name')
+    k = counter_count(request.args.get('k', 10))
+    if not name:
+        return jsonify({'error': 'Please provide a pokemon name'}), 400
+    if k is None:
+        return jsonify({'error': 'k must be a positive integer'}), 400
+    
+    etag = response_etag('counters', name, str(k))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return cached_json(find_counters(name, k), etag)
+
+def team_analysis_names(names):
+    """Error message for an unusable /team/analyze name list, or None"""
+    if not isinstance(names, list) or not names or not all(isinstance(n, str) for n in names):
+        return 'Please provide a list of Pokemon names'
+    if len(names) > TEAM_ANALYSIS_LIMIT:
+        return f'Please provide at most {TEAM_ANALYSIS_LIMIT} Pokemon names'
+    return None
+
+@app.route('/team/analyze', methods=['POST'])
+def team_analyze():
+    """Shared weaknesses, resistances, coverage and threats of up to six Pokemon"""
+    data = request.get_json()
+    names = data.get('names') or []
+    
+    logging.info(f"/team/analyze called with: {names}")
+    
+    error = team_analysis_names(names)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    result = analyze_team(names)
+    if 'error' in result:
+        return jsonify(result), 404
+    return jsonify(shaped(result))
+
+@app.route('/team/analyze', methods=['GET'])
+def team_analyze_get():
+    names = [n for n in request.args.get('names', '').split(',') if n.strip()]
+    error = team_analysis_names(names)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    etag = response_etag('team/analyze', *names)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return cached_json(analyze_team(names), etag)
+
+@app.route('/health', methods=['GET'])
+def health():
+    return jsonify({"status": "ok", "classifier": classifier_status(), "upstream": upstream_stats(), "cache": cache_stats(),
+                    "snapshot": snapshot_info()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
 
 # -- Run Server --
+# Development server only; in production run gunicorn -c gunicorn.conf.py app:app
 
 if __name__ == "__main__":
     logging.info("Starting MCP server...")
@@ -0,0 +1,6 @@
+# ASGI entry point, e.g.: uvicorn asgi:application --workers 4
+# WsgiToAsgi runs the Flask app in a thread pool; requests still take a thread each.
+from asgiref.wsgi import WsgiToAsgi
+from app import app
+
+application = WsgiToAsgi(app)
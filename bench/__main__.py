@@ -0,0 +1,81 @@
+"""
+Run the benchmark suite and check it against this machine's baseline.
+
+    python -m bench                      # micro + load, fail on regression
+    python -m bench --update-baseline    # record this machine's numbers as the baseline
+
+Exits with status 1 when any benchmark regresses by more than the tolerance
+(BENCH_TOLERANCE, default 0.25, for the load tests; BENCH_MICRO_TOLERANCE,
+default 1.0, for the noisier micro-benchmarks). Baselines are
+machine-specific and bench/baseline.json is not checked in: record one on
+the machine that runs the comparison before relying on the check.
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+from bench import bench_micro
+from bench.harness import (BASELINE_PATH, DEFAULT_TOLERANCE, MICRO_TOLERANCE, compare, format_row, load_baseline,
+                           save_baseline)
+
+
+def run_load(args):
+    """Run bench.bench_load in a fresh interpreter (the app is configured at import)"""
+    command = [sys.executable, "-m", "bench.bench_load", "--json",
+               "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+               "--latency-ms", str(args.latency_ms), "--error-rate", str(args.error_rate)]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    results = json.loads(output.strip().splitlines()[-1])
+    for name, result in results.items():
+        print(format_row(name, result))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=100, help="micro-benchmark passes")
+    parser.add_argument("--requests", type=int, default=200, help="load-test requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0, help="stub latency per upstream call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream calls that fail")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="load-test tolerance")
+    parser.add_argument("--micro-tolerance", type=float, default=MICRO_TOLERANCE, help="micro-benchmark tolerance")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="save these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    micro, load = {}, {}
+    if not args.skip_micro:
+        micro = bench_micro.main(args.repeat)
+    if not args.skip_load:
+        load = run_load(args)
+    results = dict(micro, **load)
+
+    if args.update_baseline:
+        baseline = load_baseline(args.baseline)
+        baseline.update(results)
+        save_baseline(baseline, args.baseline)
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"No baseline at {args.baseline}; record one with --update-baseline")
+        return 0
+    tolerances = f"tolerance {args.tolerance:.0%}, micro {args.micro_tolerance:.0%}"
+    regressions = compare(micro, baseline, args.micro_tolerance) + compare(load, baseline, args.tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS ({tolerances}):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions against {args.baseline} ({tolerances})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
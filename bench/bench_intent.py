@@ -0,0 +1,93 @@
+"""
+Benchmark the classifier backends on descriptions the query parser can't
+read: the embedding intent matcher against BART-MNLI zero-shot.
+
+Runs both over the labelled corpus in bench/fixtures/intents.json (each
+query with the role or type it should map to) and reports top-1 accuracy,
+accuracy above each backend's confidence threshold, and per-query latency.
+Needs sentence-transformers and transformers; the first run downloads the
+models.
+
+    python -m bench.bench_intent --repeat 3
+"""
+import os
+import json
+import tempfile
+
+from modules.classifier_module import CLASSIFIER_MODEL
+from modules.intent_module import INTENT_MODEL, IntentMatcher
+from modules.query_module import ALL_ROLES, ALL_TYPES
+from bench.harness import format_row, time_calls
+
+INTENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "intents.json")
+LABELS = ALL_ROLES + ALL_TYPES
+# Defaults of CLASSIFIER_THRESHOLD for each backend
+THRESHOLDS = {"embedding": 0.4, "zero-shot": 0.3}
+
+
+def load_intents(path=INTENTS_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def embedding_backend():
+    # A scratch embeddings file, so the run includes neither a stale nor a shared one
+    path = os.path.join(tempfile.mkdtemp(), "intent_embeddings.npz")
+    matcher = IntentMatcher(INTENT_MODEL, path)
+    return lambda text: matcher.match_many([text], LABELS)[0]
+
+
+def zero_shot_backend():
+    from transformers import pipeline
+
+    classifier = pipeline("zero-shot-classification", model=CLASSIFIER_MODEL)
+    return lambda text: classifier(text, LABELS)
+
+
+def accuracy(classify, corpus, threshold):
+    """(top-1 correct, correct and above threshold, mismatches)"""
+    correct = confident = 0
+    failures = []
+    for case in corpus:
+        result = classify(case["query"])
+        if result["labels"][0] == case["expected"]:
+            correct += 1
+            confident += result["scores"][0] > threshold
+        else:
+            failures.append((case["query"], case["expected"], result["labels"][0], result["scores"][0]))
+    return correct, confident, failures
+
+
+def main(repeat=3, verbose=False, backends=("embedding", "zero-shot")):
+    corpus = load_intents()
+    texts = [(case["query"],) for case in corpus]
+    factories = {"embedding": embedding_backend, "zero-shot": zero_shot_backend}
+
+    results = {}
+    for name in backends:
+        classify = factories[name]()
+        correct, confident, failures = accuracy(classify, corpus, THRESHOLDS[name])
+        timing = time_calls(classify, texts, repeat, rounds=1)
+        results[name] = dict(timing, correct=correct, confident=confident, total=len(corpus))
+        print(format_row(f"intent.{name}", timing))
+        print(f"{'':<28} accuracy {correct}/{len(corpus)}  above threshold {confident}/{len(corpus)}")
+        if verbose:
+            for query, expected, got, score in failures:
+                print(f"    {query!r}: expected {expected}, got {got} ({score:.2f})")
+
+    if len(results) == 2:
+        speedup = results["zero-shot"]["p50"] / results["embedding"]["p50"]
+        print(f"embedding speedup (p50)      {speedup:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus for timing")
+    parser.add_argument("--backend", choices=["embedding", "zero-shot"], action="append",
+                        help="only run this backend (repeatable)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="list mismatches")
+    args = parser.parse_args()
+    main(args.repeat, args.verbose, tuple(args.backend or ("embedding", "zero-shot")))
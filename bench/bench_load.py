@@ -0,0 +1,150 @@
+"""
+End-to-end load test of the Flask routes against the local PokeAPI stub.
+
+Starts the stub (with optional latency and error injection) and the app on
+a threaded local HTTP server, with a throwaway index, no snapshot and the
+classifier off, then fires a fixed number of requests per route at a fixed
+concurrency and reports throughput and p50/p95/p99.
+
+The app reads its configuration at import, so run this in a fresh
+interpreter (python -m bench runs it as a subprocess for that reason).
+
+    python -m bench.bench_load --requests 400 --concurrency 8 --latency-ms 20
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench.bench_parser import load_corpus
+from bench.harness import format_row, summarize
+from bench.stub_pokeapi import load_fixtures, start_stub_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def route_bodies(names, queries, seed=0):
+    """route -> function returning a fresh request body"""
+    rng = random.Random(seed)
+    return {
+        "/info": lambda: {"name": rng.choice(names)},
+        "/compare": lambda: dict(zip(("pokemon1", "pokemon2"), rng.sample(names, 2))),
+        "/strategy": lambda: dict(zip(("name1", "name2"), rng.sample(names, 2))),
+        "/compare/batch": lambda: {"names": rng.sample(names, 6)},
+        "/team": lambda: {"description": rng.choice(queries)},
+    }
+
+
+def start_app(base_url, workdir):
+    """Import the app against the stub and serve it; returns (server, url)"""
+    os.environ.update({
+        "POKEAPI_BASE_URL": base_url,
+        "POKEMON_INDEX_PATH": os.path.join(workdir, "index.db"),
+        "POKEMON_SNAPSHOT_PATH": "",
+        "CLASSIFIER_MODE": "off",
+        "ROSTER_LIMIT": str(len(load_fixtures())),
+    })
+    from werkzeug.serving import make_server
+
+    # The app logs to mcp.log in the working directory; keep that in workdir
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import app as app_module
+    finally:
+        os.chdir(cwd)
+    # Per-request log lines would dominate the console (and the timings)
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def load_route(url, make_body, total, concurrency):
+    """POST total requests at a fixed concurrency; returns a summary"""
+    local = threading.local()
+    bodies = [make_body() for _ in range(total)]
+
+    def send(body):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = session.post(url, json=body, timeout=30)
+            latency = time.perf_counter() - start
+            # Every generated body is valid, so any 4xx/5xx (or a 200 carrying
+            # an "error", as /info and /compare report upstream failures) failed
+            payload = response.json()
+            ok = response.status_code < 400 and not (isinstance(payload, dict) and "error" in payload)
+        except (requests.exceptions.RequestException, ValueError):
+            latency = time.perf_counter() - start
+            ok = False
+        return latency, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(send, bodies))
+    elapsed = time.perf_counter() - start
+    return summarize([latency for latency, _ in outcomes], elapsed, errors=sum(not ok for _, ok in outcomes))
+
+
+def run(total=200, concurrency=8, latency_ms=0, error_rate=0.0, routes=None, warmup=True, seed=1, rounds=3):
+    stub_server, stub, base_url = start_stub_server(latency_ms=latency_ms, error_rate=error_rate, seed=seed)
+    names = [p["name"] for p in stub.pokemon]
+    queries = [case["query"] for case in load_corpus()]
+    bodies = route_bodies(names, queries)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server, app_url = start_app(base_url, workdir)
+        try:
+            if warmup:
+                # Fill the index and the roster so routes are measured warm
+                requests.post(f"{app_url}/team", json={"description": "6 attackers"}, timeout=60)
+                requests.post(f"{app_url}/compare/batch", json={"names": names}, timeout=60)
+            results = {}
+            for route in routes or bodies:
+                # Best of a few rounds, so one noisy round doesn't read as a regression
+                runs = [load_route(app_url + route, bodies[route], total, concurrency) for _ in range(rounds)]
+                results[f"load.{route}"] = min(runs, key=lambda r: (r["errors"], r["p95"]))
+            return results
+        finally:
+            server.shutdown()
+            stub_server.shutdown()
+
+
+def main(total=200, concurrency=8, latency_ms=0, error_rate=0.0, routes=None, warmup=True, seed=1, as_json=False):
+    results = run(total, concurrency, latency_ms, error_rate, routes, warmup, seed)
+    if as_json:
+        print(json.dumps(results))
+        return results
+    for name, result in results.items():
+        print(format_row(name, result))
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0, help="stub latency per upstream call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream calls that fail")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the injected failures")
+    parser.add_argument("--route", action="append", dest="routes", help="only load this route (repeatable)")
+    parser.add_argument("--cold", action="store_true", help="skip the warm-up pass")
+    parser.add_argument("--json", action="store_true", help="print the results as one JSON line")
+    args = parser.parse_args()
+    main(args.requests, args.concurrency, args.latency_ms, args.error_rate, args.routes, not args.cold, args.seed, args.json)
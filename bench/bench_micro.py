@@ -0,0 +1,90 @@
+"""
+Micro-benchmarks for the CPU-bound pieces of the app, without any I/O:
+
+    parser      QueryParser.parse over the labelled query corpus
+    roles       classify_roles on the whole fixture roster, and
+                determine_pokemon_role on single records
+    types       matchup_score on single pairs, and matchup_table on the
+                whole fixture roster against itself
+    counters    building the per-typing counter table, and counter lookups
+
+    python -m bench.bench_micro --repeat 200
+"""
+import numpy as np
+
+from modules.pokeapi_module import slim_pokemon
+from modules.query_module import QueryParser
+from modules.roster_module import RosterIndex, classify_roles, determine_pokemon_role, make_member, stat_vector
+from modules.type_module import encode_many, matchup_score, matchup_table
+from bench.bench_parser import load_corpus
+from bench.harness import format_row, time_calls
+from bench.stub_pokeapi import load_fixtures
+
+# Roster size used for the whole-roster benchmarks (the fixtures, tiled)
+ROSTER_SIZE = 1024
+
+
+def _records():
+    return [slim_pokemon(p) for p in load_fixtures()]
+
+
+def bench_parser(repeat):
+    records = _records()
+    parser = QueryParser([r["name"] for r in records])
+    texts = [(case["query"].lower(),) for case in load_corpus()]
+    return {"parser.parse": time_calls(parser.parse, texts, repeat)}
+
+
+def bench_roles(repeat):
+    records = _records()
+    stats = np.array([stat_vector({s["stat"]["name"]: s["base_stat"] for s in r["stats"]}) for r in records])
+    roster = np.resize(stats, (ROSTER_SIZE, stats.shape[1]))
+    return {
+        "roles.classify_roles": time_calls(classify_roles, [(roster,)], repeat),
+        "roles.determine_role": time_calls(determine_pokemon_role, [(r,) for r in records], repeat),
+    }
+
+
+def bench_types(repeat):
+    typings = [r["types"] for r in _records()]
+    pairs = [(a, d) for a in typings for d in typings]
+    roster = encode_many((typings * (ROSTER_SIZE // len(typings) + 1))[:ROSTER_SIZE])
+    return {
+        "types.matchup_score": time_calls(matchup_score, pairs, max(1, repeat // 20)),
+        "types.matchup_table": time_calls(matchup_table, [(roster, roster)], max(1, repeat // 20)),
+    }
+
+
+def bench_counters(repeat):
+    records = _records()
+    members = [make_member(dict(r, name=f"{r['name']}-{i}")) for i in range(ROSTER_SIZE // len(records) + 1)
+               for r in records][:ROSTER_SIZE]
+    index = RosterIndex(members)
+    typings = [(r["types"],) for r in records]
+    return {
+        "counters.build_table": time_calls(index._build_counter_table, [()], max(1, repeat // 20)),
+        "counters.lookup": time_calls(index.counters, typings, repeat),
+    }
+
+
+def run(repeat=100):
+    results = {}
+    for bench in (bench_parser, bench_roles, bench_types, bench_counters):
+        results.update(bench(repeat))
+    return results
+
+
+def main(repeat=100):
+    results = run(repeat)
+    for name, result in results.items():
+        print(format_row(name, result))
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=100, help="passes over each input set")
+    args = parser.parse_args()
+    main(args.repeat)
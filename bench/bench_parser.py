@@ -0,0 +1,125 @@
+"""
+Benchmark the single-pass query parser against the legacy regex parser.
+
+Runs both over the labelled corpus in bench/fixtures/queries.json and
+reports accuracy (exact match of the parsed requirements; an empty
+expectation means "falls through to the classifier") and throughput.
+
+    python -m bench.bench_parser --repeat 2000
+"""
+import os
+import re
+import json
+import time
+from collections import defaultdict
+
+from modules.query_module import ALL_TYPES, QueryParser
+from bench.stub_pokeapi import load_fixtures
+
+QUERIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "queries.json")
+
+
+def legacy_parse(text):
+    """STEPS 1-3 of universal_query_parser as they were before the single-pass parser"""
+    text = text.lower().strip()
+    requirements = defaultdict(int)
+
+    patterns = [
+        r"(\d+)\s+(tank|tanks|attacker|attackers|support|supports|supporter|supporters|balanced|special\s*attacker|physical\s*attacker)",
+        r"(\d+)\s+(fire|water|grass|electric|psychic|ice|dragon|dark|fairy|fighting|poison|ground|flying|bug|rock|ghost|steel|normal)\s*(type|types|pokemon|pokémon)?",
+        r"(?:want|need|give\s*me|get\s*me)\s+(\d+)\s+(tank|tanks|attacker|attackers|support|supports|supporter|supporters|balanced|special\s*attacker|physical\s*attacker)",
+        r"(?:want|need|give\s*me|get\s*me)\s+(\d+)\s+(fire|water|grass|electric|psychic|ice|dragon|dark|fairy|fighting|poison|ground|flying|bug|rock|ghost|steel|normal)",
+    ]
+    for pattern in patterns:
+        for match in re.findall(pattern, text):
+            if len(match) >= 2:
+                count = int(match[0])
+                category = match[1].strip().replace('s', '').replace('er', '')
+                if category in ['tank']:
+                    requirements['tank'] += count
+                elif category in ['attack', 'attacker']:
+                    requirements['attacker'] += count
+                elif category in ['support', 'supporter']:
+                    requirements['support'] += count
+                elif category in ['balanced']:
+                    requirements['balanced'] += count
+                elif category in ['special attack', 'special attacker']:
+                    requirements['special attacker'] += count
+                elif category in ['physical attack', 'physical attacker']:
+                    requirements['physical attacker'] += count
+                elif category in ALL_TYPES:
+                    requirements[category] += count
+
+    pokemon_name_pattern = r"\b(pikachu|charizard|blastoise|venusaur|alakazam|gengar|dragonite|mewtwo|mew|articuno|zapdos|moltres)\b"
+    for name in re.findall(pokemon_name_pattern, text):
+        requirements[name] += 1
+
+    if not requirements:
+        if any(word in text for word in ['tank', 'tanks']):
+            requirements['tank'] = 6
+        elif any(word in text for word in ['attack', 'attacker', 'attackers']):
+            requirements['attacker'] = 6
+        elif any(word in text for word in ['support', 'supporter', 'supporters']):
+            requirements['support'] = 6
+        elif any(word in text for word in ['balanced']):
+            requirements['balanced'] = 6
+        for poke_type in ALL_TYPES:
+            if poke_type in text:
+                requirements[poke_type] = 6
+                break
+
+    return requirements
+
+
+def load_corpus(path=QUERIES_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def run(parse, corpus, repeat):
+    """Returns (correct, failures, queries per second)"""
+    correct = 0
+    failures = []
+    for case in corpus:
+        got = dict(parse(case["query"].lower()))
+        if got == case["expected"]:
+            correct += 1
+        else:
+            failures.append((case["query"], case["expected"], got))
+
+    texts = [case["query"].lower() for case in corpus]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            parse(text)
+    elapsed = time.perf_counter() - start
+    return correct, failures, repeat * len(texts) / elapsed
+
+
+def main(repeat=1000, verbose=False):
+    corpus = load_corpus()
+    names = [p["name"] for p in load_fixtures()]
+    parser = QueryParser(names + ["mew", "articuno", "zapdos", "moltres"])
+
+    results = {}
+    for label, parse in (("legacy", legacy_parse), ("single-pass", parser.parse)):
+        correct, failures, qps = run(parse, corpus, repeat)
+        results[label] = {"correct": correct, "total": len(corpus), "qps": qps}
+        print(f"{label:<12} accuracy {correct}/{len(corpus)}  throughput {qps:,.0f} queries/s")
+        if verbose:
+            for query, expected, got in failures:
+                print(f"    {query!r}: expected {expected}, got {got}")
+
+    speedup = results["single-pass"]["qps"] / results["legacy"]["qps"]
+    print(f"speedup      {speedup:.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1000, help="passes over the corpus for timing")
+    parser.add_argument("-v", "--verbose", action="store_true", help="list mismatches")
+    args = parser.parse_args()
+    main(args.repeat, args.verbose)
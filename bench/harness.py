@@ -0,0 +1,96 @@
+"""
+Shared pieces of the benchmark suite: latency summaries and the baseline check.
+
+Every benchmark reports {count, errors, throughput, p50, p95, p99} (latencies
+in milliseconds, throughput in operations per second). compare() checks a run
+against bench/baseline.json and lists every benchmark that got slower than the
+tolerance allows. The baseline is local to the machine that recorded it and
+is not checked in.
+"""
+import os
+import json
+import time
+
+import numpy as np
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Allowed slowdown before a benchmark counts as a regression (0.25 = 25%)
+DEFAULT_TOLERANCE = float(os.environ.get("BENCH_TOLERANCE", "0.25"))
+# Micro-benchmarks time sub-millisecond calls and swing much more from run to run
+MICRO_TOLERANCE = float(os.environ.get("BENCH_MICRO_TOLERANCE", "1.0"))
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Summary of per-operation latencies (seconds) over a run that took elapsed seconds"""
+    ms = np.asarray(latencies, dtype=np.float64) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (0.0, 0.0, 0.0)
+    return {
+        "count": len(ms),
+        "errors": errors,
+        "throughput": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "p99": round(float(p99), 4),
+    }
+
+
+def time_calls(fn, args_list, repeat=1, rounds=5):
+    """
+    Call fn(*args) for every args in args_list, repeat times, and summarize.
+
+    The whole run is repeated rounds times and the fastest round is kept,
+    as timeit does, so background noise doesn't read as a regression.
+    """
+    best = None
+    for _ in range(rounds):
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for args in args_list:
+                t = time.perf_counter()
+                fn(*args)
+                latencies.append(time.perf_counter() - t)
+        result = summarize(latencies, time.perf_counter() - start)
+        if best is None or result["throughput"] > best["throughput"]:
+            best = result
+    return best
+
+
+def format_row(name, result):
+    return (f"{name:<28} {result['throughput']:>11,.1f}/s  p50 {result['p50']:>9.3f}ms  "
+            f"p95 {result['p95']:>9.3f}ms  p99 {result['p99']:>9.3f}ms  errors {result['errors']}")
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regressions of results against baseline, as readable strings.
+
+    A benchmark regresses when its p95 latency grows, or its throughput
+    drops, by more than tolerance, or when it reports errors the baseline
+    did not have. Benchmarks missing from the baseline are skipped.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result["p95"] > base["p95"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95']:.3f}ms vs baseline {base['p95']:.3f}ms")
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['throughput']:,.1f}/s vs baseline {base['throughput']:,.1f}/s")
+        if result["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: {result['errors']} errors vs baseline {base.get('errors', 0)}")
+    return regressions
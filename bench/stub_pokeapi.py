@@ -0,0 +1,156 @@
+"""
+Local PokeAPI stub that serves canned JSON from bench/fixtures.
+
+Point the app at it with POKEAPI_BASE_URL, e.g.:
+
+    python -m bench.stub_pokeapi --port 8765
+    POKEAPI_BASE_URL=http://127.0.0.1:8765/api/v2 python -m modules.prefetch_module
+
+or start it in-process from a script with start_stub_server(). Slow or
+flaky upstreams can be simulated with --latency-ms and --error-rate.
+Refresh the fixtures from the live API with `python -m bench.stub_pokeapi --record 151`.
+"""
+import os
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pokemon.json")
+
+
+def load_fixtures(path=FIXTURES_PATH):
+    """Raw PokeAPI /pokemon payloads, in dex order"""
+    with open(path) as f:
+        return json.load(f)
+
+
+class StubPokeAPI:
+    """
+    Canned PokeAPI data plus a count of the requests it has served.
+
+    latency_ms delays every response; error_rate is the fraction of requests
+    answered with a 503 instead (seed makes the failures reproducible).
+    """
+
+    def __init__(self, pokemon, latency_ms=0, error_rate=0.0, seed=None):
+        self.pokemon = list(pokemon)
+        self.by_key = {}
+        for p in self.pokemon:
+            self.by_key[p["name"]] = p
+            self.by_key[str(p["id"])] = p
+        self.latency = latency_ms / 1000.0
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.request_count = 0
+        self.error_count = 0
+        self.lock = threading.Lock()
+
+    def handle(self, path, query):
+        """Return (status, payload) for a request path"""
+        with self.lock:
+            self.request_count += 1
+            failed = self.error_rate > 0 and self.random.random() < self.error_rate
+            if failed:
+                self.error_count += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            return 503, {"detail": "Injected failure."}
+
+        parts = [p for p in path.split("/") if p]
+        if parts[:2] != ["api", "v2"] or len(parts) < 3 or parts[2] != "pokemon":
+            return 404, {"detail": "Not found."}
+
+        if len(parts) == 3:
+            limit = int(query.get("limit", ["20"])[0])
+            offset = int(query.get("offset", ["0"])[0])
+            page = self.pokemon[offset:offset + limit]
+            return 200, {
+                "count": len(self.pokemon),
+                "results": [{"name": p["name"], "url": f"/api/v2/pokemon/{p['id']}/"} for p in page],
+            }
+
+        pokemon = self.by_key.get(parts[3].lower())
+        if pokemon is None:
+            return 404, {"detail": "Not found."}
+        return 200, pokemon
+
+
+def _make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            status, payload = stub.handle(url.path, parse_qs(url.query))
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_stub_server(port=0, fixtures=None, latency_ms=0, error_rate=0.0, seed=None):
+    """
+    Start the stub in a background thread.
+
+    Returns (server, stub, base_url); call server.shutdown() when done.
+    port=0 picks a free port.
+    """
+    stub = StubPokeAPI(fixtures if fixtures is not None else load_fixtures(), latency_ms, error_rate, seed)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(stub))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/api/v2"
+    return server, stub, base_url
+
+
+def record_fixtures(limit, path=FIXTURES_PATH, base_url="https://pokeapi.co/api/v2"):
+    """Download raw /pokemon payloads from the live API into the fixture file"""
+    import requests
+
+    session = requests.Session()
+    names = [p["name"] for p in session.get(f"{base_url}/pokemon?limit={limit}", timeout=10).json()["results"]]
+    keep = ("id", "name", "height", "weight", "base_experience", "types", "abilities", "stats")
+    pokemon = []
+    for name in names:
+        data = session.get(f"{base_url}/pokemon/{name}", timeout=10).json()
+        pokemon.append({k: data[k] for k in keep})
+    with open(path, "w") as f:
+        json.dump(pokemon, f, indent=1)
+    return len(pokemon)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local PokeAPI stub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="delay added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 503")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the injected failures")
+    parser.add_argument("--record", type=int, metavar="LIMIT",
+                        help="record the first LIMIT Pokemon from the live PokeAPI instead of serving")
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"Recorded {record_fixtures(args.record)} Pokemon into {FIXTURES_PATH}")
+    else:
+        server, stub, base_url = start_stub_server(args.port, latency_ms=args.latency_ms,
+                                                   error_rate=args.error_rate, seed=args.seed)
+        print(f"Serving {len(stub.pokemon)} Pokemon at {base_url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,56 @@
+# Production server: gunicorn -c gunicorn.conf.py app:app
+#
+# The master imports the app and loads everything the workers only read
+# (snapshot, roster index with its counter table, type tables, and the
+# classifier with CLASSIFIER_MODE=eager) before forking, so every worker
+# shares those pages copy-on-write instead of repeating the warm-up.
+#
+# kill -HUP <master pid> reloads the dataset without dropping requests: the
+# master re-reads the snapshot, role thresholds and roster index, then
+# starts fresh workers from it while the old ones finish what they have
+# in flight (up to graceful_timeout) and exit.
+import os
+import gc
+import multiprocessing
+
+bind = os.environ.get("BIND", f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Threads per worker: how many requests (async views included) a worker serves at once
+threads = int(os.environ.get("WEB_THREADS", "4"))
+worker_class = "gthread"
+preload_app = os.environ.get("WEB_PRELOAD", "1") == "1"
+timeout = int(os.environ.get("WEB_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+
+def _freeze():
+    # Keep the collector from writing to (and so un-sharing) preloaded objects
+    gc.collect()
+    gc.freeze()
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from modules.data_module import get_snapshot
+    from modules.roster_module import warm_roster_index
+
+    get_snapshot()
+    index = warm_roster_index()
+    server.log.info(f"Preloaded roster index ({len(index)} Pokemon)")
+    _freeze()
+
+
+def on_reload(server):
+    if not preload_app:
+        return  # workers re-import the app, and load the data, themselves
+    from modules.data_module import dataset_version, reload_snapshot
+    from modules.roster_module import reload_role_thresholds, warm_roster_index
+
+    gc.unfreeze()
+    reload_snapshot()
+    reload_role_thresholds()
+    index = warm_roster_index()
+    server.log.info(f"Reloaded dataset {dataset_version()} ({len(index)} Pokemon on the roster)")
+    _freeze()
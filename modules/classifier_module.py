@@ -0,0 +1,245 @@
+"""
+Classifier used as the last-resort step of the /team query parser.
+
+CLASSIFIER_BACKEND picks the model:
+
+    zero-shot   BART-MNLI zero-shot classification: one cross-encoder pass
+                per candidate label (default)
+    embedding   sentence-embedding intent matcher (modules/intent_module.py):
+                one small encoder pass per query against precomputed label
+                embeddings; compare it with python -m bench.bench_intent
+                before switching
+
+Only a minority of queries reach it, so the model is not loaded at import
+time. CLASSIFIER_MODE picks how it is served:
+
+    lazy    load in this process on first use (default)
+    eager   load when preload_classifier() is called, e.g. in a gunicorn
+            master with preload_app so forked workers share its pages
+    remote  send requests to a separate inference process at CLASSIFIER_URL
+            (start one with `python -m modules.classifier_module --port 8001`)
+    off     never load; the parser falls back to 'balanced'
+
+Concurrent calls are micro-batched: requests arriving within
+CLASSIFIER_BATCH_WINDOW_MS of each other go to the model as one batch.
+"""
+import os
+import time
+import queue
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+
+from .intent_module import INTENT_MODEL
+from .metrics_module import UPSTREAM_ERRORS
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_MODE = os.environ.get("CLASSIFIER_MODE", "lazy").lower()
+CLASSIFIER_BACKEND = os.environ.get("CLASSIFIER_BACKEND", "zero-shot").lower()
+CLASSIFIER_MODEL = os.environ.get("CLASSIFIER_MODEL", "facebook/bart-large-mnli")
+# Minimum top score for the classifier's label to be used; cosine similarities
+# and zero-shot probabilities live on different scales
+CLASSIFIER_THRESHOLD = float(os.environ.get(
+    "CLASSIFIER_THRESHOLD", "0.4" if CLASSIFIER_BACKEND == "embedding" else "0.3"))
+CLASSIFIER_URL = os.environ.get("CLASSIFIER_URL", "http://127.0.0.1:8001/classify")
+CLASSIFIER_TIMEOUT = float(os.environ.get("CLASSIFIER_TIMEOUT", "10"))
+# 0 disables batching and classifies each request on the caller's thread
+BATCH_WINDOW = float(os.environ.get("CLASSIFIER_BATCH_WINDOW_MS", "10")) / 1000
+BATCH_SIZE = int(os.environ.get("CLASSIFIER_BATCH_SIZE", "16"))
+
+_classifier = None
+_load_lock = threading.Lock()
+
+
+def get_classifier():
+    """Local classifier for CLASSIFIER_BACKEND (IntentMatcher or zero-shot pipeline), loaded on first call"""
+    global _classifier
+    if _classifier is None:
+        with _load_lock:
+            if _classifier is None:
+                if CLASSIFIER_BACKEND == "embedding":
+                    from .intent_module import IntentMatcher
+
+                    matcher = IntentMatcher()
+                    matcher.model  # load the encoder now, not on the first query
+                    _classifier = matcher
+                else:
+                    from transformers import pipeline
+
+                    logger.info(f"Loading zero-shot classifier {CLASSIFIER_MODEL}...")
+                    _classifier = pipeline("zero-shot-classification", model=CLASSIFIER_MODEL)
+                logger.info(f"{CLASSIFIER_BACKEND} classifier loaded")
+    return _classifier
+
+
+def preload_classifier():
+    """Load the model now when CLASSIFIER_MODE=eager; no-op otherwise"""
+    if CLASSIFIER_MODE == "eager":
+        get_classifier()
+
+
+_inference_client = None
+
+
+def _get_inference_client():
+    """Pooled client (timeouts, retries, circuit breaker) for the remote inference process"""
+    global _inference_client
+    if _inference_client is None:
+        from .pokeapi_module import UpstreamClient
+
+        _inference_client = UpstreamClient(CLASSIFIER_URL, read_timeout=CLASSIFIER_TIMEOUT, retries=1)
+    return _inference_client
+
+
+def _classify_remote(texts, labels):
+    from .pokeapi_module import UpstreamError
+
+    try:
+        response = _get_inference_client().request("POST", CLASSIFIER_URL, json={"texts": texts, "labels": labels})
+    except UpstreamError as e:
+        UPSTREAM_ERRORS.inc(endpoint="classifier", kind=e.kind)
+        raise
+    return response.json()["results"]
+
+
+def _classify_local(texts, labels):
+    if CLASSIFIER_BACKEND == "embedding":
+        return get_classifier().match_many(texts, labels)
+    results = get_classifier()(texts, labels)
+    # The pipeline unwraps single-item batches
+    if isinstance(results, dict):
+        results = [results]
+    return [{"labels": r["labels"], "scores": r["scores"]} for r in results]
+
+
+def classify_many(texts, labels):
+    """Classify a batch of texts in one model call"""
+    if CLASSIFIER_MODE == "off":
+        raise RuntimeError("Classifier is disabled (CLASSIFIER_MODE=off)")
+    if CLASSIFIER_MODE == "remote":
+        return _classify_remote(texts, labels)
+    return _classify_local(texts, labels)
+
+
+class _Batcher:
+    """Collects concurrent classify() calls into batches for classify_many"""
+
+    def __init__(self, window, max_size):
+        self.window = window
+        self.max_size = max_size
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def _ensure_worker(self):
+        # Threads don't survive fork, so each worker process starts its own
+        if self.pid != os.getpid():
+            with self.lock:
+                if self.pid != os.getpid():
+                    self.queue = queue.Queue()
+                    threading.Thread(target=self._run, daemon=True).start()
+                    self.pid = os.getpid()
+
+    def submit(self, text, labels):
+        self._ensure_worker()
+        future = Future()
+        self.queue.put((text, tuple(labels), future))
+        return future
+
+    def _collect(self, batch_queue):
+        batch = [batch_queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(batch_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        batch_queue = self.queue
+        while True:
+            batch = self._collect(batch_queue)
+
+            # Group by label set, and classify each distinct text once
+            groups = defaultdict(lambda: defaultdict(list))
+            for text, labels, future in batch:
+                groups[labels][text].append(future)
+
+            for labels, by_text in groups.items():
+                texts = list(by_text)
+                try:
+                    results = classify_many(texts, list(labels))
+                except Exception as e:
+                    for futures in by_text.values():
+                        for future in futures:
+                            future.set_exception(e)
+                    continue
+                for text, result in zip(texts, results):
+                    for future in by_text[text]:
+                        future.set_result(result)
+
+
+_batcher = _Batcher(BATCH_WINDOW, BATCH_SIZE)
+
+
+def classify(text, labels):
+    """Classify text against labels; returns {'labels': [...], 'scores': [...]} best first"""
+    if CLASSIFIER_MODE == "off":
+        raise RuntimeError("Classifier is disabled (CLASSIFIER_MODE=off)")
+    if BATCH_WINDOW <= 0:
+        return classify_many([text], labels)[0]
+    return _batcher.submit(text, labels).result()
+
+
+def is_loaded():
+    return _classifier is not None
+
+
+def classifier_status():
+    """Health summary for the classifier"""
+    status = {"mode": CLASSIFIER_MODE, "backend": CLASSIFIER_BACKEND, "loaded": is_loaded(),
+              "model": INTENT_MODEL if CLASSIFIER_BACKEND == "embedding" else CLASSIFIER_MODEL}
+    if CLASSIFIER_MODE == "remote":
+        status["url"] = CLASSIFIER_URL
+        if _inference_client is not None:
+            status["circuit"] = _inference_client.breaker.stats()
+    return status
+
+
+def create_inference_app():
+    """Small Flask app that serves the classifier for CLASSIFIER_MODE=remote"""
+    from flask import Flask, request, jsonify
+
+    app = Flask(__name__)
+
+    @app.route('/classify', methods=['POST'])
+    def classify_route():
+        data = request.get_json()
+        if not data or not data.get('texts') or not data.get('labels'):
+            return jsonify({'error': 'Please provide texts and labels'}), 400
+        return jsonify({"results": _classify_local(data['texts'], data['labels'])})
+
+    @app.route('/health', methods=['GET'])
+    def health():
+        return jsonify({"status": "ok", "loaded": is_loaded()})
+
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Run the classifier as a separate inference process")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    get_classifier()
+    create_inference_app().run(host=args.host, port=args.port, threaded=True)
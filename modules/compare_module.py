@@ -1,4 +1,10 @@
-from modules.info_module import get_pokemon_info
+import numpy as np
+from modules.info_module import get_pokemon_info, get_pokemon_infos_async
+from modules.prefetch_module import prefetch_pokemon
+
+# Categories a comparison awards points for
+COMPARE_CATEGORIES = ["height", "weight", "hp", "attack", "defense", "special-attack", "speed"]
+
 def get_stat_value(stats , stat_name):
     for stat in stats:
         if stat['stat']['name'] == stat_name:
@@ -8,10 +14,17 @@ def get_stat_value(stats , stat_name):
 def compare_pokemons(pokemon1_name , pokemon2_name):
     p1 = get_pokemon_info(pokemon1_name)
     p2 = get_pokemon_info(pokemon2_name)
+    return compare_infos(p1, p2)
 
+async def compare_pokemons_async(pokemon1_name, pokemon2_name):
+    """compare_pokemons with both Pokemon fetched concurrently"""
+    p1, p2 = await get_pokemon_infos_async(pokemon1_name, pokemon2_name)
+    return compare_infos(p1, p2)
 
-    if  not p1 or not p2:
-        return "One or both pokemon not found" 
+def compare_infos(p1, p2):
+    """Compare two already-fetched Pokemon (get_pokemon_info results)"""
+    if 'error' in p1 or 'error' in p2:
+        return {"error": "One or both Pokémon not found."}
     
     comparison = {
         "name": [p1["name"], p2["name"]],
@@ -54,7 +67,7 @@ def compare_pokemons(pokemon1_name , pokemon2_name):
 
      ## stats compare
 
-    stats_to_compare = ["hp","attack","defence","special-attack","speed"]
+    stats_to_compare = COMPARE_CATEGORIES[2:]
 
     for stat in stats_to_compare:
         p1_value = get_stat_value(p1["stats"],stat)
@@ -93,6 +106,68 @@ def compare_pokemons(pokemon1_name , pokemon2_name):
     return comparison
 
 
+def stat_columns(records):
+    """Stack each Pokemon's comparison categories into an (N, categories) array"""
+    columns = np.zeros((len(records), len(COMPARE_CATEGORIES)), dtype=np.int32)
+    for row, record in enumerate(records):
+        stats = {s['stat']['name']: s['base_stat'] for s in record["stats"]}
+        stats["height"] = record["height"]
+        stats["weight"] = record["weight"]
+        columns[row] = [stats.get(c, 0) for c in COMPARE_CATEGORIES]
+    return columns
+
+def compare_many(names):
+    """
+    Compare many Pokemon at once.
+
+    Reports the winner of each category and an overall ranking by points,
+    where a Pokemon scores one point per category per opponent it beats,
+    i.e. the points it would collect over a round-robin of compare_pokemons.
+    """
+    names = list(dict.fromkeys(n.lower().strip() for n in names))
+    fetched = prefetch_pokemon(names)
+    found = [n for n in names if n in fetched["records"]]
+    records = [fetched["records"][n] for n in found]
+
+    if len(records) < 2:
+        return {"error": "Need at least two Pokemon to compare", "not_found": fetched["failed"]}
+
+    columns = stat_columns(records)
+
+    # Points: for each category, how many opponents each Pokemon strictly beats
+    sorted_columns = np.sort(columns, axis=0)
+    beaten = np.empty_like(columns)
+    for col in range(columns.shape[1]):
+        beaten[:, col] = np.searchsorted(sorted_columns[:, col], columns[:, col], side="left")
+    points = beaten.sum(axis=1)
+
+    stat_winners = {}
+    best = columns.max(axis=0)
+    for col, category in enumerate(COMPARE_CATEGORIES):
+        leaders = np.flatnonzero(columns[:, col] == best[col])
+        stat_winners[category] = {
+            "winner": found[leaders[0]] if len(leaders) == 1 else "Tie",
+            "value": int(best[col]),
+        }
+
+    # Highest points first; ties broken by base stat total, then request order
+    totals = np.array([sum(s['base_stat'] for s in r["stats"]) for r in records])
+    order = np.lexsort((np.arange(len(found)), -totals, -points))
+    ranking = [
+        {"rank": rank, "name": found[i], "points": int(points[i]), "total": int(totals[i])}
+        for rank, i in enumerate(order, 1)
+    ]
+
+    return {
+        "pokemon": found,
+        "stats": {found[i]: dict(zip(COMPARE_CATEGORIES, map(int, columns[i]))) for i in range(len(found))},
+        "stat_winners": stat_winners,
+        "ranking": ranking,
+        "overall_winner": ranking[0]["name"],
+        "not_found": fetched["failed"],
+    }
+
+
 if __name__ == "__main__":
     result = compare_pokemons("pikachu" ,"charizard")
     print(result)
\ No newline at end of file
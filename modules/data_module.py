@@ -0,0 +1,368 @@
+"""
+Shared data-access layer for Pokemon data.
+
+Every module reads Pokemon through here. A memory-mapped snapshot (built
+with `python -m modules.snapshot_module build`) is read first when one is
+present; then the per-process cache; then the shared cache every worker
+uses (the local SQLite index by default, built ahead of time with
+`python -m modules.data_module build`, or Redis via SHARED_CACHE_URL).
+PokeAPI is only called on a miss or an expired entry; fetched records are
+written back so the next lookup is local.
+"""
+import os
+import struct
+import sqlite3
+import time
+import logging
+import threading
+from array import array
+
+from .pokeapi_module import fetch_pokemon, fetch_pokemon_list, list_flight, pokeapi, pokemon_flight
+from .cache_module import LRUCache, SingleFlight
+from .metrics_module import observe_stage, register_cache, register_flight
+from .shared_cache_module import open_store
+from .type_module import TYPES, TYPE_INDEX
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = os.environ.get(
+    "POKEMON_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pokemon_index.db"),
+)
+SNAPSHOT_PATH = os.environ.get(
+    "POKEMON_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pokemon_snapshot.bin"),
+)
+# Shared (cross-process, persistent) record cache; defaults to a table in the index
+SHARED_CACHE_URL = os.environ.get("SHARED_CACHE_URL") or f"sqlite:///{INDEX_PATH}"
+# Seconds before a shared entry is refreshed from PokeAPI (0: never); expired
+# entries are still served when the refresh fails
+SHARED_CACHE_TTL = float(os.environ.get("SHARED_CACHE_TTL", str(7 * 24 * 3600)))
+# Names the data served when there is no snapshot (snapshots carry their own
+# version); bump it to invalidate HTTP caches after re-indexing
+DATASET_VERSION = os.environ.get("DATASET_VERSION", "live")
+# How many Pokemon the roster covers; set high (e.g. 1025) for the full national dex
+ROSTER_LIMIT = int(os.environ.get("ROSTER_LIMIT", "150"))
+
+_local = threading.local()
+
+_UNLOADED = object()
+_snapshot = _UNLOADED
+_snapshot_lock = threading.Lock()
+
+# Concurrent index misses for the same Pokemon share one load
+miss_flight = SingleFlight()
+register_flight("index_miss", miss_flight)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS roster (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+STAT_NAMES = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+
+
+class PokemonRecord:
+    """
+    Compact form of a Pokemon record, used by the process cache and (as
+    to_bytes()) the shared cache: type ids and the six base stats/efforts
+    in packed arrays instead of nested dicts. to_dict() rebuilds the
+    record shape the modules use.
+    """
+
+    __slots__ = ("name", "id", "height", "weight", "base_experience", "type_ids", "abilities",
+                 "base_stats", "efforts")
+
+    # id, height, weight, base experience (0xFFFF: none), type count, ability count
+    HEADER = struct.Struct("<IHHHBB")
+    NO_EXPERIENCE = 0xFFFF
+
+    def __init__(self, record=None):
+        if record is None:
+            return
+        self.name = record["name"]
+        self.id = record["id"]
+        self.height = record["height"]
+        self.weight = record["weight"]
+        self.base_experience = record["base_experience"]
+        self.type_ids = bytes(TYPE_INDEX[t] for t in record["types"])
+        self.abilities = tuple(record["abilities"])
+        by_name = {s["stat"]["name"]: s for s in record["stats"]}
+        self.base_stats = array("H", (by_name[n]["base_stat"] if n in by_name else 0 for n in STAT_NAMES))
+        self.efforts = array("B", (by_name[n].get("effort", 0) if n in by_name else 0 for n in STAT_NAMES))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "id": self.id,
+            "height": self.height,
+            "weight": self.weight,
+            "types": [TYPES[i] for i in self.type_ids],
+            "abilities": list(self.abilities),
+            "base_experience": self.base_experience,
+            "stats": [
+                {"base_stat": base, "effort": effort, "stat": {"name": stat_name}}
+                for stat_name, base, effort in zip(STAT_NAMES, self.base_stats, self.efforts)
+            ],
+        }
+
+    def to_bytes(self):
+        """Packed binary form (about an eighth of the record's JSON size: ~63 bytes vs ~540)"""
+        experience = self.NO_EXPERIENCE if self.base_experience is None else self.base_experience
+        parts = [
+            self.HEADER.pack(self.id, self.height, self.weight, experience, len(self.type_ids), len(self.abilities)),
+            self.type_ids,
+            self.base_stats.tobytes(),
+            self.efforts.tobytes(),
+        ]
+        for text in (self.name,) + self.abilities:
+            encoded = text.encode()
+            parts += [bytes((len(encoded),)), encoded]
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        record = cls()
+        record.id, record.height, record.weight, experience, n_types, n_abilities = cls.HEADER.unpack_from(data)
+        record.base_experience = None if experience == cls.NO_EXPERIENCE else experience
+        offset = cls.HEADER.size
+        record.type_ids = bytes(data[offset:offset + n_types])
+        offset += n_types
+        record.base_stats = array("H")
+        record.base_stats.frombytes(data[offset:offset + 2 * len(STAT_NAMES)])
+        offset += 2 * len(STAT_NAMES)
+        record.efforts = array("B", data[offset:offset + len(STAT_NAMES)])
+        offset += len(STAT_NAMES)
+        texts = []
+        for _ in range(1 + n_abilities):
+            length = data[offset]
+            texts.append(bytes(data[offset + 1:offset + 1 + length]).decode())
+            offset += 1 + length
+        record.name = texts[0]
+        record.abilities = tuple(texts[1:])
+        return record
+
+
+# Bounded process-local cache in front of the shared cache. Its TTL never
+# exceeds SHARED_CACHE_TTL, so a warm worker still picks up refreshed records
+POKEMON_CACHE_TTL = float(os.environ.get("POKEMON_CACHE_TTL", "0"))
+pokemon_cache = LRUCache(
+    maxsize=int(os.environ.get("POKEMON_CACHE_SIZE", "2048")),
+    ttl=min(filter(None, (POKEMON_CACHE_TTL, SHARED_CACHE_TTL)), default=None),
+)
+register_cache("pokemon", pokemon_cache)
+
+# Shared across worker processes and restarts
+shared_cache = open_store(SHARED_CACHE_URL)
+register_cache("shared", shared_cache)
+
+
+def get_snapshot():
+    """The mapped snapshot at SNAPSHOT_PATH, or None when there isn't a usable one"""
+    global _snapshot
+    if _snapshot is _UNLOADED:
+        with _snapshot_lock:
+            if _snapshot is _UNLOADED:
+                _snapshot = _open_snapshot(SNAPSHOT_PATH)
+    return _snapshot
+
+
+def _open_snapshot(path):
+    from .snapshot_module import Snapshot
+
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Ignoring snapshot {path}: {e}")
+        return None
+    logger.info(f"Loaded snapshot {path} ({len(snapshot)} Pokemon, version {snapshot.version})")
+    return snapshot
+
+
+def set_snapshot(snapshot):
+    """Use snapshot (or None for no snapshot) instead of the file at SNAPSHOT_PATH"""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = snapshot
+
+
+def reload_snapshot():
+    """Re-map SNAPSHOT_PATH, e.g. after a new snapshot was built; returns the snapshot or None"""
+    snapshot = _open_snapshot(SNAPSHOT_PATH)
+    set_snapshot(snapshot)
+    # Records cached from the previous dataset would shadow the new one
+    pokemon_cache.clear()
+    return snapshot
+
+
+def dataset_version():
+    """Version of the data being served: the snapshot's, else DATASET_VERSION"""
+    snapshot = get_snapshot()
+    return snapshot.version if snapshot else DATASET_VERSION
+
+
+def snapshot_info():
+    snapshot = get_snapshot()
+    return snapshot.info() if snapshot else None
+
+
+def _connect():
+    """One SQLite connection per thread"""
+    conn = getattr(_local, "conn", None)
+    # A connection inherited from a preloading parent process must not be reused
+    if conn is None or _local.pid != os.getpid():
+        conn = sqlite3.connect(INDEX_PATH, timeout=30)
+        # WAL lets prefetch threads write while others read
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+
+def store_pokemon(record):
+    """Write a slim record into the shared cache"""
+    shared_cache.set(f"pokemon:{record['name']}", PokemonRecord(record).to_bytes(), SHARED_CACHE_TTL)
+
+
+def _lookup(name):
+    """(PokemonRecord, stale) from the shared cache, or None"""
+    entry = shared_cache.get(f"pokemon:{name.lower()}")
+    if entry is None:
+        return None
+    data, stale = entry
+    return PokemonRecord.from_bytes(data), stale
+
+
+def lookup_pokemon(name):
+    """Read a record from the shared cache only (fresh or stale); None when not cached"""
+    entry = _lookup(name)
+    return entry[0].to_dict() if entry else None
+
+
+def cached_pokemon(name):
+    """A Pokemon record from the snapshot or the process cache only (no I/O); None when in neither"""
+    start = time.perf_counter()
+    name = name.lower().strip()
+    snapshot = get_snapshot()
+    record = snapshot.get(name) if snapshot is not None else None
+    if record is None:
+        cached = pokemon_cache.get(name)
+        record = cached.to_dict() if cached is not None else None
+    if record is not None:
+        observe_stage("fetch_hit", time.perf_counter() - start)
+    return record
+
+
+def get_pokemon(name):
+    """Get a Pokemon record: snapshot, process cache, shared cache, then PokeAPI"""
+    record = cached_pokemon(name)
+    if record is not None:
+        return record
+
+    start = time.perf_counter()
+    name = name.lower().strip()
+    entry = _lookup(name)
+    stage = "fetch_hit"
+    if entry is None or entry[1]:
+        entry = miss_flight.do(name, _load_pokemon, name)
+        stage = "fetch_miss"
+    record = None
+    if entry is not None:
+        # A stale copy served because the refresh failed stays out of the
+        # process cache, so the next request tries PokeAPI again
+        if not entry[1]:
+            pokemon_cache.set(name, entry[0])
+        record = entry[0].to_dict()
+    observe_stage(stage, time.perf_counter() - start)
+    return record
+
+
+def _load_pokemon(name):
+    # Re-check: a load that finished just before this one may have stored it
+    entry = _lookup(name)
+    if entry is not None and not entry[1]:
+        return entry
+    record = fetch_pokemon(name)
+    if record is not None:
+        store_pokemon(record)
+        return PokemonRecord(record), False
+    # Upstream failed: an expired copy beats no answer
+    return entry
+
+
+def get_pokemon_list(limit=ROSTER_LIMIT):
+    """Get the roster as [{'name': ...}, ...], reading through to PokeAPI on a miss"""
+    snapshot = get_snapshot()
+    if snapshot is not None and snapshot.roster_limit >= limit:
+        return [{"name": name} for name in snapshot.roster(limit)]
+
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT name FROM roster ORDER BY position LIMIT ?", (limit,)
+    ).fetchall()
+    # The stored roster covers this request if it came from a fetch at least
+    # this large, even when upstream had fewer Pokemon than the limit
+    fetched = conn.execute("SELECT value FROM meta WHERE key = 'roster_limit'").fetchone()
+    if len(rows) >= limit or (fetched and int(fetched[0]) >= limit):
+        return [{"name": r[0]} for r in rows]
+
+    results = fetch_pokemon_list(limit)
+    if results:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO roster VALUES (?, ?)",
+                [(i, p["name"]) for i, p in enumerate(results)],
+            )
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('roster_limit', ?)", (str(limit),))
+        return [{"name": p["name"]} for p in results]
+
+    # Upstream unavailable: serve whatever we have locally
+    return [{"name": r[0]} for r in rows]
+
+
+def cache_stats():
+    """Hit/miss/eviction counters for the process-local and shared Pokemon caches"""
+    return dict(pokemon_cache.stats(), shared=shared_cache.stats())
+
+
+def upstream_stats():
+    """In-flight and coalesced counts for index misses and upstream fetches, and the client's breaker state"""
+    return {"index_miss": miss_flight.stats(), "pokemon": pokemon_flight.stats(), "list": list_flight.stats(),
+            "client": pokeapi.stats()}
+
+
+def build_index(limit=ROSTER_LIMIT, workers=None):
+    """Fetch the roster and every Pokemon on it into the local index"""
+    from .prefetch_module import prefetch_roster
+
+    result = prefetch_roster(limit, workers)
+    logger.info(f"Indexed {len(result['records'])}/{len(result['roster'])} Pokemon into {SHARED_CACHE_URL}")
+    return len(result["records"]), len(result["failed"])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage the local Pokemon index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="fetch the roster into the local index")
+    build.add_argument("--limit", type=int, default=ROSTER_LIMIT)
+    build.add_argument("--workers", type=int, default=None)
+    sub.add_parser("purge", help="drop shared cache entries past their stale grace")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        ok, missing = build_index(args.limit, args.workers)
+        print(f"Indexed {ok} Pokemon ({missing} failed) into {SHARED_CACHE_URL}")
+    elif args.command == "purge":
+        print(f"Purged {shared_cache.purge()} entries from {SHARED_CACHE_URL}")
@@ -1,35 +1,25 @@
-import requests
+import asyncio
 import logging
+from .data_module import get_pokemon
 
 # Logging setup
 
 logger = logging.getLogger(__name__)
- 
+
 def get_pokemon_info(pokemon_name):
-    url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}"
+    info = get_pokemon(pokemon_name)
 
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+    if info is None:
+        logger.error(f"Error fetching info for {pokemon_name}")
+        return {"error": f"Could not fetch info for {pokemon_name}"}
 
+    logger.info(f"Fetched info for {pokemon_name}")
+    return info
 
-        info = {
-            "name": data["name"],
-            "id": data["id"],
-            "height": data["height"],
-            "weight": data["weight"],
-            "types": [t["type"]["name"] for t in data["types"]],
-            "abilities": [a["ability"]["name"] for a in data["abilities"]],
-            "base_experience": data["base_experience"],
-            "stats": data["stats"],
-             
-         }
+async def get_pokemon_info_async(pokemon_name):
+    """Async get_pokemon_info; runs the pooled, cached lookup off the event loop"""
+    return await asyncio.to_thread(get_pokemon_info, pokemon_name)
 
-        logger.info(f"Fetched info for{pokemon_name}")
-        return info
-    
-    except requests.exceptions.RequestsException as e:
-        logger.error(f"Error fetching info for {pokemon_name}: {e}")
-        return {"error": f"Could not fetch info for {pokemon_name}"}
-    
\ No newline at end of file
+async def get_pokemon_infos_async(*pokemon_names):
+    """Fetch several Pokemon concurrently"""
+    return await asyncio.gather(*(get_pokemon_info_async(name) for name in pokemon_names))
@@ -0,0 +1,189 @@
+"""
+Embedding-based intent matcher for /team descriptions the parser can't read.
+
+Every label (a role or a type) has a handful of example phrases. Their
+sentence embeddings are computed once and stored on disk
+(INTENT_EMBEDDINGS_PATH); a query is embedded once and scored against all
+of them with one matrix product, each label taking its best phrase's
+cosine similarity. That replaces the zero-shot classifier's one
+cross-encoder pass per candidate label.
+
+    python -m modules.intent_module build     precompute the embeddings
+    python -m modules.intent_module match "a rain team"
+"""
+import os
+import hashlib
+import logging
+import zipfile
+import threading
+
+import numpy as np
+
+from .query_module import ALL_ROLES, ALL_TYPES
+
+logger = logging.getLogger(__name__)
+
+INTENT_MODEL = os.environ.get("INTENT_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+INTENT_EMBEDDINGS_PATH = os.environ.get(
+    "INTENT_EMBEDDINGS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "intent_embeddings.npz"),
+)
+
+# Example phrases per label; the label itself is always included
+INTENT_EXAMPLES = {
+    "attacker": ["offensive team", "hits hard", "fast sweepers", "glass cannons", "all-out offense",
+                 "high damage dealers"],
+    "tank": ["bulky team", "defensive walls", "pokemon that can take hits", "high hp and defense",
+             "stall team", "hard to knock out"],
+    "support": ["team support", "healers and buffers", "status moves and screens", "helps teammates",
+                "utility pokemon"],
+    "balanced": ["well rounded team", "a bit of everything", "good all around", "versatile team",
+                 "no particular strategy"],
+    "special attacker": ["strong special attacks", "special sweepers", "high special attack",
+                         "powerful beam attacks"],
+    "physical attacker": ["strong physical attacks", "physical sweepers", "high attack stat",
+                          "hard hitting melee moves"],
+    "fire": ["sun team", "burning flames", "blazing hot", "volcano"],
+    "water": ["rain team", "ocean and sea", "swimming pokemon", "surf"],
+    "grass": ["plants and forests", "leaves and flowers", "nature team"],
+    "electric": ["lightning", "thunder and sparks", "electricity", "charged up"],
+    "psychic": ["mind powers", "telepathy and telekinesis", "psychic powers"],
+    "ice": ["snow team", "hail team", "frozen and cold", "blizzard"],
+    "dragon": ["dragons", "mythical dragons", "pseudo legendaries"],
+    "dark": ["sneaky and evil", "night time", "shadows and tricks"],
+    "fairy": ["cute and magical", "fairy tale", "pink and sparkly"],
+    "fighting": ["martial arts", "punching and kicking", "fighters and brawlers"],
+    "poison": ["toxic", "venom and poison", "poisonous pokemon"],
+    "ground": ["sand team", "earthquake", "desert and dirt"],
+    "flying": ["birds", "flying in the sky", "wings and flight"],
+    "bug": ["insects", "bugs and beetles", "creepy crawlies"],
+    "rock": ["rocks and stones", "boulders", "fossils"],
+    "ghost": ["spooky", "haunted", "ghosts and spirits"],
+    "steel": ["metal", "iron and steel", "robots and machines"],
+    "normal": ["ordinary pokemon", "plain and simple", "everyday pokemon"],
+}
+INTENT_LABELS = ALL_ROLES + ALL_TYPES
+
+
+def _phrases(labels):
+    """Every phrase for labels, grouped by label, and where each label's group starts"""
+    phrases, starts = [], []
+    for label in labels:
+        starts.append(len(phrases))
+        phrases += [label] + INTENT_EXAMPLES.get(label, [])
+    return phrases, np.array(starts, dtype=np.intp)
+
+
+class IntentMatcher:
+    """Cosine top-k of query embeddings against precomputed label-phrase embeddings"""
+
+    def __init__(self, model_name=INTENT_MODEL, path=INTENT_EMBEDDINGS_PATH, labels=INTENT_LABELS):
+        self.model_name = model_name
+        self.path = path
+        self._model = None
+        self._lock = threading.Lock()
+        self._tables = {}  # label tuple -> (labels, phrase embeddings, phrase start per label)
+        self.labels = list(labels)
+        self._tables[tuple(self.labels)] = self._load_table(self.labels)
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    logger.info(f"Loading sentence embedding model {self.model_name}...")
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def embed(self, texts):
+        """Unit-length float32 embeddings, one row per text"""
+        vectors = self.model.encode(list(texts), batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _digest(self, phrases):
+        return hashlib.sha256("\0".join([self.model_name] + phrases).encode()).hexdigest()[:16]
+
+    def _load_table(self, labels):
+        phrases, starts = _phrases(labels)
+        digest = self._digest(phrases)
+        embeddings = None
+        if self.path and os.path.exists(self.path):
+            try:
+                with np.load(self.path) as stored:
+                    if str(stored["digest"]) == digest:
+                        embeddings = stored["embeddings"]
+            except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+                logger.error(f"Ignoring intent embeddings {self.path}: {e}")
+        if embeddings is None:
+            embeddings = self.embed(phrases)
+            if self.path:
+                self.save(embeddings, digest)
+        return list(labels), embeddings, starts
+
+    def save(self, embeddings, digest):
+        # Per-process name: workers building the table at the same time don't clobber each other
+        tmp = f"{self.path}.tmp.{os.getpid()}.npz"
+        try:
+            np.savez(tmp, embeddings=embeddings, digest=np.array(digest))
+            os.replace(tmp, self.path)
+            logger.info(f"Saved {len(embeddings)} intent embeddings to {self.path}")
+        except OSError as e:
+            logger.warning(f"Could not save intent embeddings to {self.path}: {e}")
+
+    def _table(self, labels):
+        key = tuple(labels)
+        table = self._tables.get(key)
+        if table is None:
+            # Label sets other than the default are embedded once and kept in memory
+            phrases, starts = _phrases(labels)
+            table = self._tables[key] = (list(labels), self.embed(phrases), starts)
+        return table
+
+    def scores(self, texts, labels=None):
+        """(texts, labels) cosine similarity of each text to each label's closest phrase"""
+        labels, embeddings, starts = self._table(labels or self.labels)
+        similarity = self.embed(texts) @ embeddings.T
+        return labels, np.maximum.reduceat(similarity, starts, axis=1)
+
+    def match_many(self, texts, labels=None, k=5):
+        """Top-k labels per text, as classify() results: {'labels': [...], 'scores': [...]} best first"""
+        labels, scores = self.scores(texts, labels)
+        k = min(k, len(labels))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            ranked = candidates[np.argsort(-row[candidates], kind="stable")]
+            results.append({"labels": [labels[i] for i in ranked], "scores": [float(row[i]) for i in ranked]})
+        return results
+
+
+def build_embeddings(model_name=INTENT_MODEL, path=INTENT_EMBEDDINGS_PATH):
+    """Compute and store the label-phrase embeddings"""
+    if os.path.exists(path):
+        os.remove(path)
+    return IntentMatcher(model_name, path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage the intent matcher's label embeddings")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="precompute the label-phrase embeddings")
+    build.add_argument("--model", default=INTENT_MODEL)
+    build.add_argument("--output", default=INTENT_EMBEDDINGS_PATH)
+    match = sub.add_parser("match", help="show the top labels for a description")
+    match.add_argument("text")
+    match.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        matcher = build_embeddings(args.model, args.output)
+        print(f"Stored embeddings for {len(matcher.labels)} labels in {args.output}")
+    elif args.command == "match":
+        result = IntentMatcher().match_many([args.text], k=args.k)[0]
+        for label, score in zip(result["labels"], result["scores"]):
+            print(f"{score:.3f}  {label}")
@@ -0,0 +1,198 @@
+"""
+Request and stage latency metrics in Prometheus text format.
+
+Histograms are kept per route (REQUEST_LATENCY) and per route and stage
+(STAGE_LATENCY); the stages are parse, classify, fetch_hit, fetch_miss,
+role_calc and select. Wrap work in span("stage") to time it. Counters
+cover upstream errors, and registered LRU caches and single-flight groups
+are exported from their own counters at scrape time. Metrics are per
+process; scrape each worker.
+"""
+import time
+import threading
+import contextvars
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route of the request being served; spans are labelled with it
+current_route = contextvars.ContextVar("current_route", default="none")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[n] for n in self.labelnames), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][slot] += 1
+            entry[1] += value
+
+    def count(self, **labels):
+        entry = self._values.get(tuple(labels[n] for n in self.labelnames))
+        return sum(entry[0]) if entry else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', le)])} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "pokeapi_request_duration_seconds", "Time to handle a request, by route", ("route", "method", "status"))
+STAGE_LATENCY = Histogram(
+    "pokeapi_stage_duration_seconds", "Time spent in each processing stage, by route", ("route", "stage"))
+UPSTREAM_ERRORS = Counter(
+    "pokeapi_upstream_errors_total", "Failed calls to PokeAPI (and the remote classifier)", ("endpoint", "kind"))
+
+_metrics = [REQUEST_LATENCY, STAGE_LATENCY, UPSTREAM_ERRORS]
+_caches = {}
+_flights = {}
+
+
+def register_cache(name, cache):
+    """Export a cache's counters (hits, misses, evictions, expirations, stale_hits, size: whichever it has)"""
+    _caches[name] = cache
+
+
+def register_flight(name, flight):
+    """Export a SingleFlight's in-flight, executed and coalesced counts"""
+    _flights[name] = flight
+
+
+def observe_stage(stage, seconds):
+    STAGE_LATENCY.observe(seconds, route=current_route.get(), stage=stage)
+
+
+@contextmanager
+def span(stage):
+    """Time the enclosed block as one observation of stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def timed_iter(stage, iterable):
+    """
+    Iterate, timing only the work done producing items (not the consumer's
+    work between them); the total is observed once iteration ends.
+    """
+    elapsed = 0.0
+    iterator = iter(iterable)
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        observe_stage(stage, elapsed)
+
+
+def _render_caches():
+    if not _caches:
+        return []
+    stats = {name: cache.stats() for name, cache in sorted(_caches.items())}
+    lines = []
+    for field, kind, doc in (("hits", "counter", "Cache hits"), ("misses", "counter", "Cache misses"),
+                             ("evictions", "counter", "Entries evicted for space"),
+                             ("expirations", "counter", "Entries dropped on TTL expiry"),
+                             ("stale_hits", "counter", "Expired entries read for refresh or stale-if-error"),
+                             ("size", "gauge", "Entries currently cached")):
+        name = f"pokeapi_cache_{field}" + ("_total" if kind == "counter" else "")
+        samples = [f'{name}{{cache="{cache}"}} {values[field]}' for cache, values in stats.items() if field in values]
+        if samples:
+            lines += [f"# HELP {name} {doc}", f"# TYPE {name} {kind}"] + samples
+    return lines
+
+
+def _render_flights():
+    if not _flights:
+        return []
+    stats = {name: flight.stats() for name, flight in sorted(_flights.items())}
+    lines = []
+    for field, kind, doc in (("in_flight", "gauge", "Keys with a call currently running"),
+                             ("executed", "counter", "Calls that ran the function"),
+                             ("coalesced", "counter", "Calls that waited on another caller's result instead")):
+        name = f"pokeapi_singleflight_{field}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {name} {doc}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{flight="{flight}"}} {values[field]}' for flight, values in stats.items()]
+    return lines
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _metrics:
+        lines += metric.render()
+    lines += _render_caches()
+    lines += _render_flights()
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
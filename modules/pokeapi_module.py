@@ -0,0 +1,242 @@
+"""
+The one client for upstream HTTP calls (PokeAPI, and the remote classifier).
+
+UpstreamClient wraps a keep-alive connection pool with strict connect/read
+timeouts, jittered exponential-backoff retries on connection errors,
+timeouts, 429 and 5xx, a token-bucket rate limiter and a circuit breaker.
+While the breaker is open calls fail fast without touching the network,
+and the data layer keeps serving what it already has locally.
+"""
+import os
+import time
+import random
+import logging
+import threading
+import requests
+
+from .cache_module import SingleFlight
+from .metrics_module import UPSTREAM_ERRORS, register_flight
+from .resilience_module import CircuitBreaker, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Base URL is configurable so the app can point at a mirror or a local stub
+POKEAPI_BASE_URL = os.environ.get("POKEAPI_BASE_URL", "https://pokeapi.co/api/v2").rstrip("/")
+CONNECT_TIMEOUT = float(os.environ.get("POKEAPI_CONNECT_TIMEOUT", "2"))
+REQUEST_TIMEOUT = float(os.environ.get("POKEAPI_TIMEOUT", "5"))
+POOL_SIZE = int(os.environ.get("POKEAPI_POOL_SIZE", "32"))
+RETRIES = int(os.environ.get("POKEAPI_RETRIES", "2"))
+RETRY_BACKOFF = float(os.environ.get("POKEAPI_RETRY_BACKOFF", "0.1"))
+# Requests per second toward PokeAPI (0 disables), and how many may burst
+RATE_LIMIT = float(os.environ.get("POKEAPI_RATE_LIMIT", "50"))
+RATE_BURST = int(os.environ.get("POKEAPI_RATE_BURST", "100"))
+BREAKER_THRESHOLD = int(os.environ.get("POKEAPI_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET = float(os.environ.get("POKEAPI_BREAKER_RESET", "30"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Longest Retry-After we are willing to honour inside a request
+MAX_RETRY_AFTER = 2.0
+
+
+class UpstreamError(Exception):
+    """An upstream call failed; kind is a short label for metrics and logs"""
+
+    def __init__(self, message, kind="other"):
+        super().__init__(message)
+        self.kind = kind
+
+
+class NotFound(UpstreamError):
+    def __init__(self, message):
+        super().__init__(message, "not_found")
+
+
+def error_kind(error):
+    """Short label for a requests exception (or UpstreamError), for the upstream error counter"""
+    if isinstance(error, UpstreamError):
+        return error.kind
+    if isinstance(error, requests.exceptions.Timeout):
+        return "timeout"
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return "connection"
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return f"http_{error.response.status_code}"
+    return "other"
+
+
+def _make_session(pool_size=POOL_SIZE):
+    """Keep-alive session shared by every thread, sized for bulk prefetch"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class UpstreamClient:
+    """Pooled HTTP client with timeouts, retries, rate limiting and a circuit breaker"""
+
+    def __init__(self, base_url, connect_timeout=CONNECT_TIMEOUT, read_timeout=REQUEST_TIMEOUT,
+                 retries=RETRIES, backoff=RETRY_BACKOFF, rate=0, burst=None,
+                 breaker_threshold=BREAKER_THRESHOLD, breaker_reset=BREAKER_RESET, pool_size=POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.session = _make_session(pool_size)
+        self._pid = os.getpid()
+        self._session_lock = threading.Lock()
+        self.limiter = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.retried = 0
+
+    def _get_session(self):
+        # Pooled sockets inherited across fork would be shared with the parent,
+        # so each worker process opens its own
+        if self._pid != os.getpid():
+            with self._session_lock:
+                if self._pid != os.getpid():
+                    self.session = _make_session(self.pool_size)
+                    self._pid = os.getpid()
+        return self.session
+
+    def _sleep_before_retry(self, attempt, response=None):
+        # Full jitter: spread retries from many threads instead of stampeding together
+        delay = random.uniform(0, self.backoff * 2 ** attempt)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), MAX_RETRY_AFTER))
+        time.sleep(delay)
+
+    def request(self, method, path, read_timeout=None, **kwargs):
+        """
+        Send a request and return the response (any status below 400).
+
+        Raises NotFound on 404 and UpstreamError when the call is refused
+        (breaker open, rate limited) or fails after all retries.
+        """
+        url = path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+        timeout = (self.timeout[0], read_timeout or self.timeout[1])
+
+        if not self.breaker.allow():
+            raise UpstreamError(f"Circuit open for {self.base_url}", "circuit_open")
+
+        error = None
+        settled = False  # whether this call has told the breaker how upstream is doing
+        try:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self.retried += 1
+                    self._sleep_before_retry(attempt - 1, getattr(error, "response", None))
+                if not self.limiter.acquire(timeout=timeout[1]):
+                    error = UpstreamError(f"Rate limited calling {url}", "rate_limited")
+                    break
+                try:
+                    response = self._get_session().request(method, url, timeout=timeout, **kwargs)
+                except requests.exceptions.RequestException as e:
+                    # Timeouts, refused connections, truncated or undecodable bodies, redirect loops...
+                    error = e
+                    continue
+                if response.status_code in RETRY_STATUSES:
+                    error = requests.exceptions.HTTPError(f"{response.status_code} from {url}", response=response)
+                    continue
+
+                # Anything else means upstream is up, even a 404
+                self.breaker.record_success()
+                settled = True
+                if response.status_code == 404:
+                    raise NotFound(f"Not found: {url}")
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.HTTPError as e:
+                    raise UpstreamError(str(e), error_kind(e)) from e
+                return response
+
+            if isinstance(error, UpstreamError):
+                # Our own limiter refused the call; that says nothing about upstream health
+                raise error
+            self.breaker.record_failure()
+            settled = True
+            raise UpstreamError(f"{method} {url} failed after {self.retries + 1} attempts: {error}",
+                                error_kind(error)) from error
+        finally:
+            if not settled:
+                # Always give back a half-open trial slot, or the breaker would refuse every later call
+                self.breaker.release()
+
+    def get_json(self, path, **kwargs):
+        """Decoded JSON body; a body that isn't JSON raises UpstreamError (kind bad_response)"""
+        response = self.request("GET", path, **kwargs)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise UpstreamError(f"Invalid JSON from {response.url}: {e}", "bad_response") from e
+
+    def stats(self):
+        return {"circuit": self.breaker.stats(), "rate_limit": self.limiter.stats(), "retries": self.retried}
+
+
+pokeapi = UpstreamClient(POKEAPI_BASE_URL, rate=RATE_LIMIT, burst=RATE_BURST)
+
+# Concurrent fetches of the same resource share one upstream request
+pokemon_flight = SingleFlight()
+list_flight = SingleFlight()
+register_flight("pokemon", pokemon_flight)
+register_flight("list", list_flight)
+
+
+def slim_pokemon(data):
+    """Keep only the fields the app reads from a raw /pokemon response"""
+    return {
+        "name": data["name"],
+        "id": data["id"],
+        "height": data["height"],
+        "weight": data["weight"],
+        "types": [t["type"]["name"] for t in data["types"]],
+        "abilities": [a["ability"]["name"] for a in data["abilities"]],
+        "base_experience": data["base_experience"],
+        "stats": [
+            {"base_stat": s["base_stat"], "effort": s.get("effort", 0), "stat": {"name": s["stat"]["name"]}}
+            for s in data["stats"]
+        ],
+    }
+
+
+def fetch_pokemon(name):
+    """Fetch one Pokemon from PokeAPI and return its slim record, or None"""
+    name = name.lower()
+    return pokemon_flight.do(name, _fetch_pokemon, name)
+
+
+def _fetch_pokemon(name):
+    try:
+        data = pokeapi.get_json(f"pokemon/{name.lower()}")
+        try:
+            return slim_pokemon(data)
+        except (KeyError, TypeError) as e:
+            raise UpstreamError(f"Unexpected payload for pokemon/{name}: {e!r}", "bad_response") from e
+    except NotFound:
+        return None
+    except UpstreamError as e:
+        UPSTREAM_ERRORS.inc(endpoint="pokemon", kind=e.kind)
+        logger.error(f"Error fetching {name} from PokeAPI: {e}")
+        return None
+
+
+def fetch_pokemon_list(limit=150):
+    """Fetch the Pokemon name list ([{'name', 'url'}, ...]) from PokeAPI"""
+    return list_flight.do(limit, _fetch_pokemon_list, limit)
+
+
+def _fetch_pokemon_list(limit):
+    try:
+        data = pokeapi.get_json("pokemon", params={"limit": limit}, read_timeout=REQUEST_TIMEOUT * 2)
+        results = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(results, list) or not all(isinstance(p, dict) and "name" in p for p in results):
+            raise UpstreamError("Unexpected payload for the pokemon list", "bad_response")
+        return results
+    except UpstreamError as e:
+        UPSTREAM_ERRORS.inc(endpoint="list", kind=e.kind)
+        logger.error(f"Error fetching Pokemon list from PokeAPI: {e}")
+        return []
@@ -0,0 +1,116 @@
+"""
+Concurrent bulk prefetch of Pokemon details.
+
+Loads the whole roster through the data layer with a bounded thread pool
+so a cold process (or a fresh index) is filled in parallel instead of one
+PokeAPI call at a time. Usable from app startup or from the command line:
+
+    python -m modules.prefetch_module --limit 1025 --workers 16
+"""
+import os
+import time
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .data_module import ROSTER_LIMIT, cached_pokemon, get_pokemon, get_pokemon_list
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = int(os.environ.get("PREFETCH_WORKERS", "16"))
+
+
+def _load(name):
+    try:
+        return get_pokemon(name)
+    except Exception as e:
+        logger.error(f"Prefetch of {name} failed: {e}")
+        return None
+
+
+def _loaded(names, workers):
+    """(name, record or None) for each name as its load finishes"""
+    if len(names) < 2:
+        # Nothing to overlap: no pool, load on the calling thread
+        for name in names:
+            yield name, _load(name)
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names)))) as pool:
+        # Run each load in the caller's context so metrics keep its route label
+        context = contextvars.copy_context()
+        futures = {pool.submit(context.copy().run, _load, name): name for name in names}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def prefetch_pokemon(names, workers=None, progress=None):
+    """
+    Load many Pokemon concurrently.
+
+    Records already in the snapshot or the process cache are read inline;
+    only the rest are loaded on a thread pool (none is started when every
+    name is a hit). progress, if given, is called as progress(done, total,
+    name, ok) after each Pokemon finishes. Returns a dict with the loaded
+    records (by name), the names that failed, and the elapsed time in seconds.
+    """
+    workers = workers or PREFETCH_WORKERS
+    names = list(dict.fromkeys(names))
+    total = len(names)
+    records = {}
+    failed = []
+    start = time.perf_counter()
+
+    misses = []
+    done = 0
+    for name in names:
+        record = cached_pokemon(name)
+        if record is None:
+            misses.append(name)
+            continue
+        records[name] = record
+        done += 1
+        if progress:
+            progress(done, total, name, True)
+
+    for name, record in _loaded(misses, workers):
+        if record is None:
+            failed.append(name)
+        else:
+            records[name] = record
+        done += 1
+        if progress:
+            progress(done, total, name, record is not None)
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Prefetched {len(records)}/{total} Pokemon in {elapsed:.2f}s ({len(failed)} failed)")
+    return {"records": records, "failed": failed, "elapsed": elapsed}
+
+
+def prefetch_roster(limit=None, workers=None, progress=None):
+    """Prefetch every Pokemon on the roster returned by get_pokemon_list"""
+    roster = get_pokemon_list(limit or ROSTER_LIMIT)
+    result = prefetch_pokemon([p["name"] for p in roster], workers=workers, progress=progress)
+    result["roster"] = [p["name"] for p in roster]
+    return result
+
+
+def _print_progress(done, total, name, ok):
+    status = "ok" if ok else "FAILED"
+    print(f"[{done}/{total}] {name}: {status}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Prefetch the Pokemon roster into the local index")
+    parser.add_argument("--limit", type=int, default=None, help="roster size (default: ROSTER_LIMIT)")
+    parser.add_argument("--workers", type=int, default=None, help="concurrent fetches (default: PREFETCH_WORKERS)")
+    parser.add_argument("--quiet", action="store_true", help="don't print per-Pokemon progress")
+    args = parser.parse_args()
+
+    result = prefetch_roster(args.limit, args.workers, None if args.quiet else _print_progress)
+    print(f"Loaded {len(result['records'])}/{len(result['roster'])} Pokemon in {result['elapsed']:.2f}s")
+    if result["failed"]:
+        print(f"Failed: {', '.join(sorted(result['failed']))}")
+        raise SystemExit(1)
@@ -0,0 +1,120 @@
+"""
+Single-pass parser for /team descriptions.
+
+The description is tokenized once with a precompiled pattern and the
+tokens are walked left to right, picking up counts, roles, types and
+Pokemon names as they appear. Pokemon names come from the roster, so any
+indexed Pokemon can be requested by name (including hyphenated names
+written with a space, e.g. "mr mime").
+"""
+import re
+from collections import defaultdict
+
+# Universal definitions
+ALL_ROLES = ["attacker", "tank", "support", "balanced", "special attacker", "physical attacker"]
+ALL_TYPES = ["fire", "water", "grass", "electric", "psychic", "ice", "dragon", "dark", "fairy",
+             "fighting", "poison", "ground", "flying", "bug", "rock", "ghost", "steel", "normal"]
+
+# Used when the roster isn't available
+FALLBACK_POKEMON_NAMES = ["pikachu", "charizard", "blastoise", "venusaur", "alakazam", "gengar",
+                          "dragonite", "mewtwo", "mew", "articuno", "zapdos", "moltres"]
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[-'][^\W_]+)*")
+
+# Word -> role for counted mentions ("3 tanks")
+ROLE_WORDS = {
+    "tank": "tank", "tanks": "tank",
+    "attacker": "attacker", "attackers": "attacker",
+    "support": "support", "supports": "support", "supporter": "support", "supporters": "support",
+    "balanced": "balanced",
+}
+# "special attacker", "physical attackers", ...
+ROLE_PREFIXES = {"special": "special attacker", "physical": "physical attacker"}
+TYPE_WORDS = {t: t for t in ALL_TYPES}
+TYPE_WORDS.update({f"{t}-type": t for t in ALL_TYPES})
+# Words that may sit between a count and what it counts ("3 fire type pokemon")
+FILLER_WORDS = {"type", "types", "pokemon", "pokémon"}
+
+# Stems for mentions without a number, in priority order ("defensive team with tanks")
+ROLE_STEMS = [("tank", "tank"), ("attack", "attacker"), ("support", "support"), ("balanced", "balanced")]
+DEFAULT_COUNT = 6
+
+
+class QueryParser:
+    """Parses a normalized description into {requirement: count}"""
+
+    def __init__(self, pokemon_names=FALLBACK_POKEMON_NAMES):
+        self.pokemon_names = frozenset(pokemon_names)
+
+    def _category(self, tokens, i):
+        """(category, tokens consumed) for a role or type starting at tokens[i], else (None, 0)"""
+        token = tokens[i]
+        if token in ROLE_PREFIXES and i + 1 < len(tokens) and tokens[i + 1] in ("attacker", "attackers"):
+            return ROLE_PREFIXES[token], 2
+        if token in ROLE_WORDS:
+            return ROLE_WORDS[token], 1
+        if token in TYPE_WORDS:
+            return TYPE_WORDS[token], 1
+        return None, 0
+
+    def _pokemon(self, tokens, i):
+        """(name, tokens consumed) for a Pokemon name starting at tokens[i], else (None, 0)"""
+        if i + 1 < len(tokens):
+            joined = f"{tokens[i]}-{tokens[i + 1]}"
+            if joined in self.pokemon_names:
+                return joined, 2
+        if tokens[i] in self.pokemon_names:
+            return tokens[i], 1
+        return None, 0
+
+    def parse(self, text):
+        """
+        Parse lower-cased text. Returns a defaultdict(int) of requirements;
+        empty when nothing was recognized (the caller's cue to fall back).
+        """
+        tokens = TOKEN_PATTERN.findall(text)
+        requirements = defaultdict(int)
+        mentioned_roles = set()
+        mentioned_types = set()
+
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+
+            if token.isdigit():
+                category, used = self._category(tokens, i + 1) if i + 1 < len(tokens) else (None, 0)
+                if category:
+                    requirements[category] += int(token)
+                    i += 1 + used
+                    while i < len(tokens) and tokens[i] in FILLER_WORDS:
+                        i += 1
+                    continue
+                i += 1
+                continue
+
+            name, used = self._pokemon(tokens, i)
+            if name:
+                requirements[name] += 1
+                i += used
+                continue
+
+            # Remember un-numbered mentions for the no-count fallback below
+            for stem, role in ROLE_STEMS:
+                if token.startswith(stem):
+                    mentioned_roles.add(role)
+            if token in TYPE_WORDS:
+                mentioned_types.add(TYPE_WORDS[token])
+            i += 1
+
+        if not requirements:
+            # Handle general requests without numbers
+            for _, role in ROLE_STEMS:
+                if role in mentioned_roles:
+                    requirements[role] = DEFAULT_COUNT
+                    break
+            for poke_type in ALL_TYPES:
+                if poke_type in mentioned_types:
+                    requirements[poke_type] = DEFAULT_COUNT
+                    break
+
+        return requirements
@@ -0,0 +1,124 @@
+"""
+Building blocks for talking to flaky upstreams: a token-bucket rate
+limiter and a circuit breaker. Both are thread-safe and keep counters
+for stats().
+"""
+import time
+import threading
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Holds up to burst tokens, refilled at rate tokens per second; each call
+    takes one. rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+        self.rejected = 0
+
+    def _reserve(self):
+        """Take a token (possibly going into debt); returns how long to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, timeout=None):
+        """Wait for a token; False (without taking one) if that would take longer than timeout"""
+        if self.rate <= 0:
+            return True
+        wait = self._reserve()
+        if timeout is not None and wait > timeout:
+            with self._lock:
+                self._tokens += 1  # give the reservation back
+                self.rejected += 1
+            return False
+        if wait:
+            self.waited += wait
+            time.sleep(wait)
+        return True
+
+    def stats(self):
+        return {"rate": self.rate, "burst": self.burst, "waited": round(self.waited, 3), "rejected": self.rejected}
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing.
+
+    closed: calls go through; failure_threshold consecutive failures open it.
+    open: calls are refused until reset_timeout seconds have passed.
+    half_open: one trial call goes through; success closes, failure re-opens.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.refused = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """True if a call may go upstream now"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.refused += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial = False
+            if self._state == self.HALF_OPEN:
+                if self._trial:
+                    self.refused += 1
+                    return False
+                self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial = False
+
+    def release(self):
+        """Give back a half-open trial slot for a call that never reached upstream"""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+    def stats(self):
+        return {"state": self.state, "failures": self._failures, "opened": self.opened, "refused": self.refused}
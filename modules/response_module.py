@@ -0,0 +1,113 @@
+"""
+Response shaping and encoding: compact bodies, field selection, a faster
+JSON encoder and gzip/brotli compression.
+
+    compact     stats arrays ([{"base_stat", "effort", "stat": {"name"}}, ...])
+                become {"hp": 45, ...} maps, and upstream "url" fields go
+    fields      keep only the named top-level fields
+    OrjsonProvider
+                Flask JSON provider backed by orjson (optional; the stdlib
+                encoder is used without it)
+    compress    gzip, or brotli when the optional `brotli` package is present
+"""
+import os
+import gzip
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+# Preferred first
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+COMPRESSIBLE_TYPES = {"application/json", "application/x-ndjson", "text/plain"}
+
+
+def _is_stats(value):
+    return bool(value) and all(isinstance(s, dict) and "base_stat" in s and "stat" in s for s in value)
+
+
+def compact(value):
+    """value with every stats array flattened to a {name: base_stat} map and 'url' fields dropped"""
+    if isinstance(value, dict):
+        return {key: compact(item) for key, item in value.items() if key != "url"}
+    if isinstance(value, list):
+        if _is_stats(value):
+            return {s["stat"]["name"]: s["base_stat"] for s in value}
+        return [compact(item) for item in value]
+    return value
+
+
+def select_fields(value, fields):
+    """Only the given top-level fields of a dict (or of each dict in a list)"""
+    if isinstance(value, dict):
+        return {key: value[key] for key in fields if key in value}
+    if isinstance(value, list):
+        return [select_fields(item, fields) for item in value]
+    return value
+
+
+def parse_fields(text):
+    """'name, stats' -> ['name', 'stats'] (None for no selection)"""
+    fields = [f.strip() for f in (text or "").split(",") if f.strip()]
+    return fields or None
+
+
+def shape(value, compact_mode=False, fields=None):
+    """Apply compact mode and field selection; errors pass through untouched"""
+    if isinstance(value, dict) and "error" in value:
+        return value
+    if compact_mode:
+        value = compact(value)
+    if fields:
+        value = select_fields(value, fields)
+    return value
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson doing the encoding (several times faster on large bodies)"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.get("indent"):
+            return super().dumps(obj, **kwargs)
+        return self._dumps(obj).decode()
+
+    def _dumps(self, obj):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps(obj) + b"\n", mimetype=self.mimetype)
+
+
+def json_provider_class():
+    """OrjsonProvider when orjson is installed, else Flask's default provider"""
+    return OrjsonProvider if orjson else DefaultJSONProvider
+
+
+def negotiate_encoding(accept_encodings):
+    """Best content coding we support that the client accepts (werkzeug Accept), or None"""
+    best = max(ENCODINGS, key=lambda e: accept_encodings[e])
+    return best if accept_encodings[best] > 0 else None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
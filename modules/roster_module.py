@@ -0,0 +1,304 @@
+"""
+In-memory candidate index over the roster.
+
+Built once (lazily on first use, or at startup via warm_roster_index) so
+team assembly is a dict lookup per requirement instead of a scan over
+every Pokemon on the roster.
+"""
+import os
+import json
+import logging
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from .data_module import ROSTER_LIMIT, STAT_NAMES
+from .prefetch_module import prefetch_roster
+from .metrics_module import span
+from .type_module import TYPINGS, best_multiplier_table, encode_many, typing_id
+
+logger = logging.getLogger(__name__)
+
+ATTACKER_ROLES = ("attacker", "special attacker", "physical attacker")
+
+# Stat cut-offs for role assignment. Override any of them without code
+# changes through a JSON file at ROLE_THRESHOLDS_PATH (default:
+# role_thresholds.json in the project root) or inline JSON in ROLE_THRESHOLDS.
+DEFAULT_ROLE_THRESHOLDS = {
+    "tank_hp": 80,                  # tank: hp > tank_hp and defense > tank_defense
+    "tank_defense": 70,
+    "tank_bulk": 220,               # ... or hp + defense + sp. defense > tank_bulk
+    "special_attack": 90,           # special attacker: sp. attack > special_attack
+    "special_attack_lead": 70,      # ... or sp. attack > attack and > special_attack_lead
+    "physical_attack": 90,          # physical attacker: same shape on attack
+    "physical_attack_lead": 70,
+    "attacker_total": 140,          # attacker: attack + sp. attack > attacker_total and
+    "attacker_speed": 60,           #   speed > attacker_speed,
+    "attacker_both": 65,            # ... or both attacks > attacker_both
+    "support_hp": 75,               # support: hp > support_hp, or defenses > support_defenses
+    "support_defenses": 120,        #   with attack + sp. attack < support_max_attack
+    "support_max_attack": 140,
+}
+ROLE_THRESHOLDS_PATH = os.environ.get(
+    "ROLE_THRESHOLDS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "role_thresholds.json"),
+)
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def load_role_thresholds():
+    """Default thresholds overlaid with the JSON file and ROLE_THRESHOLDS env, if present"""
+    thresholds = dict(DEFAULT_ROLE_THRESHOLDS)
+    if os.path.exists(ROLE_THRESHOLDS_PATH):
+        with open(ROLE_THRESHOLDS_PATH) as f:
+            thresholds.update(json.load(f))
+    if os.environ.get("ROLE_THRESHOLDS"):
+        thresholds.update(json.loads(os.environ["ROLE_THRESHOLDS"]))
+    unknown = set(thresholds) - set(DEFAULT_ROLE_THRESHOLDS)
+    if unknown:
+        raise ValueError(f"Unknown role thresholds: {', '.join(sorted(unknown))}")
+    return thresholds
+
+
+role_thresholds = load_role_thresholds()
+
+# Counters kept per defending typing (the most a counter search can return)
+COUNTER_DEPTH = int(os.environ.get("COUNTER_SEARCH_DEPTH", "50"))
+# Weight of the stat term against the type term (one step of 2x) in counter scores
+COUNTER_STAT_WEIGHT = float(os.environ.get("COUNTER_STAT_WEIGHT", "1.0"))
+
+
+def classify_roles(stats, thresholds=None):
+    """
+    Assign a role to every row of an (N, 6) stats array (columns in
+    STAT_NAMES order) in one vectorized pass. Returns a list of role names.
+    """
+    t = thresholds or role_thresholds
+    stats = np.asarray(stats).reshape(-1, len(STAT_NAMES))
+    hp, attack, defense, sp_attack, sp_defense, speed = stats.T
+    total_def = defense + sp_defense + hp
+    total_att = attack + sp_attack
+
+    # Same cascade as the original per-Pokemon checks; np.select takes the first match
+    conditions = [
+        ((hp > t["tank_hp"]) & (defense > t["tank_defense"])) | (total_def > t["tank_bulk"]),
+        (sp_attack > t["special_attack"]) | ((sp_attack > attack) & (sp_attack > t["special_attack_lead"])),
+        (attack > t["physical_attack"]) | ((attack > sp_attack) & (attack > t["physical_attack_lead"])),
+        ((total_att > t["attacker_total"]) & (speed > t["attacker_speed"]))
+        | ((attack > t["attacker_both"]) & (sp_attack > t["attacker_both"])),
+        (hp > t["support_hp"]) | ((defense + sp_defense > t["support_defenses"]) & (total_att < t["support_max_attack"])),
+    ]
+    choices = ["tank", "special attacker", "physical attacker", "attacker", "support"]
+    return np.select(conditions, choices, default="balanced").tolist()
+
+
+def stat_vector(stats):
+    """{'hp': .., 'attack': .., ...} -> six values in STAT_NAMES order"""
+    return [stats.get(name, 0) for name in STAT_NAMES]
+
+
+def determine_pokemon_role(pokemon_info):
+    """Universal role determination based on stats"""
+    if not pokemon_info:
+        return "balanced"
+
+    try:
+        stats = {stat['stat']['name']: stat['base_stat'] for stat in pokemon_info['stats']}
+        return classify_roles([stat_vector(stats)])[0]
+    except (KeyError, TypeError):
+        return "balanced"
+
+
+class RosterIndex:
+    """Roster members keyed by name, type and role, each list kept in roster order"""
+
+    def __init__(self, members, thresholds=None):
+        self.order = [m["name"] for m in members]
+        self.by_name = {m["name"]: m for m in members}
+        self.position = {name: i for i, name in enumerate(self.order)}
+        self.by_type = defaultdict(list)
+
+        for member in members:
+            for p_type in member["types"]:
+                self.by_type[p_type].append(member["name"])
+
+        # Stats matrix for batch role assignment (and anything else vectorized)
+        self.stats = np.array([stat_vector(m["stats"]) for m in members], dtype=np.int32).reshape(-1, len(STAT_NAMES))
+        self.totals = self.stats.sum(axis=1)
+        self.type_ids = encode_many([m["types"] for m in members])
+        self.assign_roles(thresholds)
+        self._counters = None
+        self._counters_lock = threading.Lock()
+
+    def assign_roles(self, thresholds=None):
+        """(Re)compute the name -> role table for the whole roster in one pass"""
+        thresholds = dict(thresholds or role_thresholds)
+        with span("role_calc"):
+            roles = classify_roles(self.stats, thresholds) if len(self.order) else []
+        self.roles = dict(zip(self.order, roles))
+        self.thresholds = thresholds
+
+        by_role = defaultdict(list)
+        for name, role in zip(self.order, roles):
+            by_role[role].append(name)
+        # 'attacker' requests accept any of the attacker roles
+        self.attackers = [name for name, role in zip(self.order, roles) if role in ATTACKER_ROLES]
+        self.by_role = by_role
+        self._strongest = {}
+
+    def __len__(self):
+        return len(self.order)
+
+    def candidates(self, requirement):
+        """Names matching a requirement (a role, a type or a Pokemon name), in roster order"""
+        if requirement in self.by_name:
+            return [requirement]
+        if requirement == "attacker":
+            return self.attackers
+        if requirement in self.by_role:
+            return self.by_role[requirement]
+        return self.by_type.get(requirement, [])
+
+    def strongest(self, requirement=None):
+        """Candidates for a requirement (or the whole roster) by base stat total, highest first"""
+        ranked = self._strongest.get(requirement)
+        if ranked is None:
+            names = self.order if requirement is None else self.candidates(requirement)
+            ranked = sorted(names, key=lambda name: -int(self.totals[self.position[name]]))
+            self._strongest[requirement] = ranked
+        return ranked
+
+    def counter_table(self):
+        """
+        Best COUNTER_DEPTH roster positions (and scores) against every typing,
+        as two (typings, depth) arrays; built on first use.
+
+        A counter's score is its type edge, log2 of its best STAB multiplier
+        on the typing minus log2 of the typing's best STAB multiplier on it
+        (each clamped to 1/4..4x, so an immunity counts as two resistances),
+        plus COUNTER_STAT_WEIGHT times its offense/speed/bulk relative to the
+        roster's best.
+        """
+        if self._counters is None:
+            with self._counters_lock:
+                if self._counters is None:
+                    self._counters = self._build_counter_table()
+        return self._counters
+
+    def _build_counter_table(self):
+        depth = min(COUNTER_DEPTH, len(self.order))
+        offense = best_multiplier_table(self.type_ids, TYPINGS).T  # (typings, roster)
+        incoming = best_multiplier_table(TYPINGS, self.type_ids)
+        edge = np.log2(np.clip(offense, 0.25, 4.0)) - np.log2(np.clip(incoming, 0.25, 4.0))
+
+        hp, attack, defense, sp_attack, sp_defense, speed = self.stats.T.astype(np.float64)
+        strength = np.maximum(attack, sp_attack) + speed + (hp + defense + sp_defense) / 3
+        strength = strength / strength.max() if len(strength) and strength.max() else strength
+        scores = edge + COUNTER_STAT_WEIGHT * strength
+
+        # Top depth per typing, highest score first (roster order breaks ties)
+        top = np.argpartition(-scores, depth - 1, axis=1)[:, :depth]
+        order = np.lexsort((top, -np.take_along_axis(scores, top, axis=1)), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return top, np.take_along_axis(scores, top, axis=1)
+
+    def counters(self, types, k=10, exclude=()):
+        """Up to k (name, score) pairs that best counter a typing, best first"""
+        if not len(self.order):
+            return []
+        positions, scores = self.counter_table()
+        row = typing_id(types)
+        ranked = []
+        for position, score in zip(positions[row], scores[row]):
+            name = self.order[position]
+            if name in exclude:
+                continue
+            ranked.append((name, float(score)))
+            if len(ranked) == k:
+                break
+        return ranked
+
+    def member(self, name):
+        """Team-ready entry for a roster member (a copy, safe to hand out)"""
+        member = self.by_name[name]
+        return {
+            "name": member["name"],
+            "types": list(member["types"]),
+            "role": self.roles[name],
+            "stats": dict(member["stats"]),
+        }
+
+
+def make_member(info):
+    """Build a roster entry from a Pokemon record (its role comes from the index)"""
+    return {
+        "name": info["name"],
+        "types": info["types"],
+        "stats": {stat['stat']['name']: stat['base_stat'] for stat in info['stats']},
+    }
+
+
+def build_roster_index(limit=None, progress=None):
+    """Load every roster Pokemon through the data layer and index it"""
+    # Cold entries are fetched concurrently; keep the roster's original order
+    result = prefetch_roster(limit or ROSTER_LIMIT, progress=progress)
+    members = []
+    for name in result["roster"]:
+        info = result["records"].get(name)
+        if info:
+            members.append(make_member(dict(info, name=name)))
+    logger.info(f"Built roster index with {len(members)} Pokemon")
+    return RosterIndex(members)
+
+
+def roster_index_ready():
+    """True once the shared roster index has been built"""
+    return _index is not None
+
+
+def get_roster_index(progress=None):
+    """Shared roster index, built on first use (progress is passed to the prefetch)"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = build_roster_index(progress=progress)
+                # Don't pin an empty index if upstream was unavailable; retry next call
+                if not len(index):
+                    return index
+                _index = index
+    return _index
+
+
+def warm_roster_index(limit=None):
+    """(Re)build the shared roster index, e.g. at app startup"""
+    global _index
+    index = build_roster_index(limit)
+    if len(index):
+        index.counter_table()
+    # Only swap in a usable index so an upstream outage doesn't wipe a good one
+    if len(index) or _index is None:
+        _index = index
+    return _index
+
+
+def set_role_thresholds(thresholds):
+    """Change role thresholds at runtime; the role table is recomputed once, here"""
+    global role_thresholds
+    merged = dict(role_thresholds)
+    merged.update(thresholds)
+    unknown = set(merged) - set(DEFAULT_ROLE_THRESHOLDS)
+    if unknown:
+        raise ValueError(f"Unknown role thresholds: {', '.join(sorted(unknown))}")
+    role_thresholds = merged
+    if _index is not None:
+        _index.assign_roles(merged)
+    return merged
+
+
+def reload_role_thresholds():
+    """Re-read thresholds from ROLE_THRESHOLDS_PATH / ROLE_THRESHOLDS"""
+    return set_role_thresholds(load_role_thresholds())
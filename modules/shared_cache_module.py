@@ -0,0 +1,156 @@
+"""
+Shared second-level cache: a key -> bytes store with TTLs that every worker
+process on a node (or, with Redis, every node) reads and writes.
+
+    sqlite:///path/to/file.db   on-disk SQLite table (the default; WAL mode,
+                                safe for many processes)
+    redis://host:port/db        any Redis-compatible server (needs the
+                                optional `redis` package)
+
+Each value is stored with the time it stops being fresh. get() still
+returns expired entries (flagged as stale) for STALE_GRACE seconds past
+that, so callers can refresh them but fall back to the stale copy when
+upstream is unavailable.
+"""
+import os
+import time
+import struct
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# How long past its TTL an entry is kept for stale-if-error reads
+STALE_GRACE = float(os.environ.get("SHARED_CACHE_STALE_GRACE", str(30 * 24 * 3600)))
+
+_FRESH_UNTIL = struct.Struct("<d")
+NEVER = float("inf")
+
+
+class SQLiteStore:
+    """Shared cache in a SQLite table; one connection per thread (and process)"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        fresh_until REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        # Never reuse a connection inherited across fork
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        """(value, stale) for key, or None when absent or past its stale grace"""
+        row = self._connect().execute("SELECT value, fresh_until FROM cache WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or row[1] + STALE_GRACE < now:
+            self.misses += 1
+            return None
+        stale = row[1] < now
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return bytes(row[0]), stale
+
+    def set(self, key, value, ttl=None):
+        fresh_until = time.time() + ttl if ttl else NEVER
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (key, sqlite3.Binary(value), fresh_until))
+
+    def delete(self, key):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge(self):
+        """Drop entries past their stale grace; returns how many"""
+        conn = self._connect()
+        with conn:
+            return conn.execute("DELETE FROM cache WHERE fresh_until < ?", (time.time() - STALE_GRACE,)).rowcount
+
+    def stats(self):
+        return {"backend": "sqlite", "path": self.path, "hits": self.hits, "stale_hits": self.stale_hits,
+                "misses": self.misses}
+
+
+class RedisStore:
+    """Shared cache in Redis; expiry is left to Redis once the stale grace has passed"""
+
+    def __init__(self, url, prefix="pokeapi:"):
+        import redis
+
+        self.url = url
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        # A Redis outage degrades to cache misses instead of failing requests
+        self.errors = redis.exceptions.RedisError
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            data = self.client.get(self.prefix + key)
+        except self.errors as e:
+            logger.error(f"Shared cache read failed: {e}")
+            data = None
+        if data is None:
+            self.misses += 1
+            return None
+        (fresh_until,) = _FRESH_UNTIL.unpack_from(data)
+        stale = fresh_until < time.time()
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return data[_FRESH_UNTIL.size:], stale
+
+    def set(self, key, value, ttl=None):
+        fresh_until = time.time() + ttl if ttl else NEVER
+        expire = int(ttl + STALE_GRACE) if ttl else None
+        try:
+            self.client.set(self.prefix + key, _FRESH_UNTIL.pack(fresh_until) + value, ex=expire)
+        except self.errors as e:
+            logger.error(f"Shared cache write failed: {e}")
+
+    def delete(self, key):
+        try:
+            self.client.delete(self.prefix + key)
+        except self.errors as e:
+            logger.error(f"Shared cache delete failed: {e}")
+
+    def purge(self):
+        return 0  # Redis expires keys itself
+
+    def stats(self):
+        return {"backend": "redis", "url": self.url, "hits": self.hits, "stale_hits": self.stale_hits,
+                "misses": self.misses}
+
+
+def open_store(url):
+    """Store for a sqlite:///path or redis://... URL"""
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported shared cache URL: {url}")
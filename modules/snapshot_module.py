@@ -0,0 +1,265 @@
+"""
+Offline binary snapshot of the Pokemon dataset.
+
+A snapshot is one read-only file holding every roster Pokemon in
+fixed-width form:
+
+    header   magic, format version, counts, roster limit, build time, dataset version
+    records  one fixed-width row per Pokemon (ids, sizes, type bitmask,
+             six base stats and efforts, offsets into the string table)
+    roster   record numbers in roster order
+    lookup   record numbers sorted by name (binary searched for lookups)
+    strings  UTF-8 names and comma-joined abilities
+
+Workers map the file with mmap and read it in place through NumPy views,
+so every process on a node shares the same physical pages and a cold
+worker is warm as soon as the file is mapped. Build one with
+
+    python -m modules.snapshot_module build --limit 1025
+"""
+import os
+import mmap
+import time
+import struct
+import hashlib
+import logging
+
+import numpy as np
+
+from .data_module import STAT_NAMES
+from .type_module import TYPES, TYPE_INDEX
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PKSNAP\x00\x00"
+FORMAT_VERSION = 1
+
+# magic, format version, record count, roster count, roster limit, build time, dataset version
+HEADER = struct.Struct("<8sIIIIQ16s")
+ALIGN = 8
+
+RECORD_DTYPE = np.dtype([
+    ("id", "<u4"),
+    ("height", "<u2"),
+    ("weight", "<u4"),
+    ("base_experience", "<u2"),
+    ("type_mask", "<u4"),
+    ("primary_type", "u1"),
+    ("name_offset", "<u4"),
+    ("name_length", "<u2"),
+    ("abilities_offset", "<u4"),
+    ("abilities_length", "<u2"),
+    ("base_stats", "<u2", (len(STAT_NAMES),)),
+    ("efforts", "u1", (len(STAT_NAMES),)),
+])
+
+# base_experience is null upstream for some forms
+NO_EXPERIENCE = 0xFFFF
+
+
+def _padded(size):
+    return -(-size // ALIGN) * ALIGN
+
+
+def _layout(count, roster_count):
+    """Byte offsets of the records, roster, lookup and string sections"""
+    records = _padded(HEADER.size)
+    roster = _padded(records + count * RECORD_DTYPE.itemsize)
+    lookup = _padded(roster + roster_count * 4)
+    strings = _padded(lookup + count * 4)
+    return records, roster, lookup, strings
+
+
+def type_mask(types):
+    """Type names -> bitmask with bit TYPE_INDEX[t] set for each type"""
+    mask = 0
+    for t in types:
+        mask |= 1 << TYPE_INDEX[t]
+    return mask
+
+
+def write_snapshot(path, records, roster, roster_limit=None):
+    """
+    Write records (slim record dicts) and roster (names, in order) to path.
+
+    The file is written next to path and moved into place, so processes
+    that already mapped the old snapshot keep reading it undisturbed.
+    Returns the dataset version of the new snapshot.
+    """
+    records = sorted(records, key=lambda r: r["id"])
+    position = {record["name"]: i for i, record in enumerate(records)}
+    roster = [name for name in roster if name in position]
+
+    rows = np.zeros(len(records), dtype=RECORD_DTYPE)
+    strings = bytearray()
+    for i, record in enumerate(records):
+        name = record["name"].encode()
+        abilities = ",".join(record["abilities"]).encode()
+        stats = {s["stat"]["name"]: s for s in record["stats"]}
+        base_experience = record["base_experience"]
+
+        row = rows[i]
+        row["id"] = record["id"]
+        row["height"] = record["height"]
+        row["weight"] = record["weight"]
+        row["base_experience"] = NO_EXPERIENCE if base_experience is None else base_experience
+        row["type_mask"] = type_mask(record["types"])
+        row["primary_type"] = TYPE_INDEX[record["types"][0]]
+        row["name_offset"], row["name_length"] = len(strings), len(name)
+        strings += name
+        row["abilities_offset"], row["abilities_length"] = len(strings), len(abilities)
+        strings += abilities
+        row["base_stats"] = [stats[n]["base_stat"] if n in stats else 0 for n in STAT_NAMES]
+        row["efforts"] = [stats[n].get("effort", 0) if n in stats else 0 for n in STAT_NAMES]
+
+    roster_rows = np.array([position[name] for name in roster], dtype="<u4")
+    lookup_rows = np.array(sorted(range(len(records)), key=lambda i: records[i]["name"].encode()), dtype="<u4")
+    sections = (rows.tobytes(), roster_rows.tobytes(), lookup_rows.tobytes(), bytes(strings))
+
+    digest = hashlib.sha256()
+    for section in sections:
+        digest.update(section)
+    version = digest.digest()[:16]
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(records), len(roster), roster_limit or len(roster),
+                         int(time.time()), version)
+    offsets = _layout(len(records), len(roster))
+
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for offset, section in zip(offsets, sections):
+            f.write(b"\x00" * (offset - f.tell()))
+            f.write(section)
+    os.replace(tmp_path, path)
+    return version.hex()
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, count, roster_count, roster_limit, created, version = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Pokemon snapshot")
+        if fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot format {fmt}, expected {FORMAT_VERSION}")
+
+        self.roster_limit = roster_limit
+        self.created = created
+        self.version = version.hex()
+
+        records, roster, lookup, strings = _layout(count, roster_count)
+        # Zero-copy views into the mapping
+        self.rows = np.frombuffer(self._map, dtype=RECORD_DTYPE, count=count, offset=records)
+        self.roster_rows = np.frombuffer(self._map, dtype="<u4", count=roster_count, offset=roster)
+        self.lookup_rows = np.frombuffer(self._map, dtype="<u4", count=count, offset=lookup)
+        self._strings = strings
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _string(self, offset, length):
+        start = self._strings + int(offset)
+        return self._map[start:start + int(length)].decode()
+
+    def name(self, row):
+        entry = self.rows[row]
+        return self._string(entry["name_offset"], entry["name_length"])
+
+    def find(self, name):
+        """Record number for name, or None"""
+        key = name.encode()
+        lo, hi = 0, len(self.lookup_rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self.rows[self.lookup_rows[mid]]
+            start = self._strings + int(entry["name_offset"])
+            if self._map[start:start + int(entry["name_length"])] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.lookup_rows) and self.name(self.lookup_rows[lo]) == name:
+            return int(self.lookup_rows[lo])
+        return None
+
+    def record(self, row):
+        """Rebuild the slim record dict for a record number"""
+        entry = self.rows[row]
+        mask = int(entry["type_mask"])
+        primary = int(entry["primary_type"])
+        types = [TYPES[primary]] + [TYPES[i] for i in range(len(TYPES)) if mask >> i & 1 and i != primary]
+        abilities = self._string(entry["abilities_offset"], entry["abilities_length"])
+        base_experience = int(entry["base_experience"])
+        return {
+            "name": self._string(entry["name_offset"], entry["name_length"]),
+            "id": int(entry["id"]),
+            "height": int(entry["height"]),
+            "weight": int(entry["weight"]),
+            "types": types,
+            "abilities": abilities.split(",") if abilities else [],
+            "base_experience": None if base_experience == NO_EXPERIENCE else base_experience,
+            "stats": [
+                {"base_stat": int(base), "effort": int(effort), "stat": {"name": stat_name}}
+                for stat_name, base, effort in zip(STAT_NAMES, entry["base_stats"], entry["efforts"])
+            ],
+        }
+
+    def get(self, name):
+        """Record dict for name, or None when it isn't in the snapshot"""
+        row = self.find(name)
+        return None if row is None else self.record(row)
+
+    def roster(self, limit=None):
+        """Roster names in order"""
+        rows = self.roster_rows if limit is None else self.roster_rows[:limit]
+        return [self.name(row) for row in rows]
+
+    def info(self):
+        return {"path": self.path, "version": self.version, "pokemon": len(self), "roster": len(self.roster_rows),
+                "roster_limit": self.roster_limit, "created": self.created}
+
+    def close(self):
+        self.rows = self.roster_rows = self.lookup_rows = None
+        self._map.close()
+
+
+def build_snapshot(path, limit=None, workers=None):
+    """Fetch the roster through the data layer (bypassing any current snapshot) and write a snapshot"""
+    from .data_module import ROSTER_LIMIT, set_snapshot
+    from .prefetch_module import prefetch_roster
+
+    limit = limit or ROSTER_LIMIT
+    set_snapshot(None)
+    result = prefetch_roster(limit, workers)
+    if result["failed"]:
+        logger.warning(f"Leaving {len(result['failed'])} Pokemon out of the snapshot: {', '.join(result['failed'])}")
+    version = write_snapshot(path, result["records"].values(), result["roster"], limit)
+    logger.info(f"Wrote {len(result['records'])} Pokemon to {path} (version {version})")
+    return version, len(result["records"]), len(result["failed"])
+
+
+if __name__ == "__main__":
+    import argparse
+    from .data_module import ROSTER_LIMIT, SNAPSHOT_PATH
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build or inspect the Pokemon snapshot")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="fetch the roster and write a snapshot")
+    build.add_argument("--limit", type=int, default=ROSTER_LIMIT)
+    build.add_argument("--workers", type=int, default=None)
+    build.add_argument("--output", default=SNAPSHOT_PATH)
+    show = sub.add_parser("info", help="print a snapshot's header")
+    show.add_argument("--path", default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        version, ok, missing = build_snapshot(args.output, args.limit, args.workers)
+        print(f"Wrote {ok} Pokemon ({missing} failed) to {args.output}, version {version}")
+    else:
+        print(Snapshot(args.path).info())
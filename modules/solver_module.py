@@ -0,0 +1,183 @@
+"""
+Team solver: picks a team by score instead of first fit.
+
+A team is scored on
+  - requirement satisfaction (how many requested slots it fills),
+  - offensive coverage (defending types some member hits super effectively),
+  - defensive balance (attacking types more members are weak to than resist),
+  - base stat totals,
+and searched with a beam search over a pruned candidate pool built from the
+roster index. Every expansion of the beam is one vectorized NumPy pass, and
+the search returns the best team found when the latency budget runs out
+(or the first-fit team, when that one scores higher).
+"""
+import os
+import time
+import logging
+
+import numpy as np
+
+from .type_module import EFFECTIVENESS, NO_TYPE, encode_types
+
+logger = logging.getLogger(__name__)
+
+SOLVER_BUDGET_MS = float(os.environ.get("SOLVER_BUDGET_MS", "200"))
+SOLVER_BEAM_WIDTH = int(os.environ.get("SOLVER_BEAM_WIDTH", "32"))
+# Candidates kept per requirement / per type / for padding when building the pool
+POOL_PER_REQUIREMENT = int(os.environ.get("SOLVER_POOL_PER_REQUIREMENT", "24"))
+POOL_PER_TYPE = 3
+POOL_PADDING = 24
+
+# Score weights; requirements dominate so the solver never trades a requested slot for coverage
+WEIGHT_REQUIREMENT = 100.0
+WEIGHT_OFFENSE = 3.0
+WEIGHT_DEFENSE = 4.0
+WEIGHT_STATS = 5.0  # per member at a 600 base stat total
+
+
+def _type_profiles(types):
+    """(hits super effectively, weak to, resists) as 18-long bool vectors for one typing"""
+    ids = encode_types(types)
+    real = [i for i in ids if i != NO_TYPE]
+    offense = (EFFECTIVENESS[real, :NO_TYPE] >= 2.0).any(axis=0)
+    defense = EFFECTIVENESS[:NO_TYPE, ids].prod(axis=1)
+    return offense, defense > 1.0, defense < 1.0
+
+
+def _features(roster, names, requirements):
+    """Per-name (offense, weak, resist, bst, matches) arrays, one row per name"""
+    profiles = [_type_profiles(roster.by_name[name]["types"]) for name in names]
+    offense = np.array([p[0] for p in profiles], dtype=bool).reshape(-1, NO_TYPE)
+    weak = np.array([p[1] for p in profiles], dtype=np.int32).reshape(-1, NO_TYPE)
+    resist = np.array([p[2] for p in profiles], dtype=np.int32).reshape(-1, NO_TYPE)
+    bst = roster.totals[[roster.position[name] for name in names]].astype(np.float64) / 600.0
+
+    matches = np.zeros((len(names), len(requirements)), dtype=np.int32)
+    for col, requirement in enumerate(requirements):
+        matching = set(roster.candidates(requirement))
+        for row, name in enumerate(names):
+            matches[row, col] = name in matching
+    return offense, weak, resist, bst, matches
+
+
+def _score(offense, weak, resist, bst, req, need):
+    return (WEIGHT_REQUIREMENT * np.minimum(req, need).sum() + WEIGHT_OFFENSE * offense.sum()
+            - WEIGHT_DEFENSE * (weak > resist).sum() + WEIGHT_STATS * bst)
+
+
+def score_team(roster, requirements, names, team_size=6):
+    """Solver score of a given team (roster names), for comparing it with other pickers"""
+    need = np.array([min(c, team_size) for c in requirements.values()], dtype=np.int32)
+    offense, weak, resist, bst, matches = _features(roster, list(names), list(requirements))
+    return float(_score(offense.any(axis=0), weak.sum(axis=0), resist.sum(axis=0), bst.sum(),
+                        matches.sum(axis=0), need))
+
+
+def build_pool(roster, requirements):
+    """Pruned candidate names: best few per requirement, per type and overall, by stat total"""
+    pool = []
+    for requirement, count in requirements.items():
+        pool.extend(roster.strongest(requirement)[:max(POOL_PER_REQUIREMENT, count)])
+    for poke_type in roster.by_type:
+        pool.extend(roster.strongest(poke_type)[:POOL_PER_TYPE])
+    pool.extend(roster.strongest()[:POOL_PADDING])
+    return list(dict.fromkeys(pool))
+
+
+class TeamSolver:
+    """Beam search over a candidate pool for one set of requirements"""
+
+    def __init__(self, roster, requirements, team_size=6):
+        self.roster = roster
+        self.team_size = team_size
+        self.pool = build_pool(roster, requirements)
+        self.requirements = list(requirements)
+        self.need = np.array([min(c, team_size) for c in requirements.values()], dtype=np.int32)
+
+        self.offense, self.weak, self.resist, self.bst, self.matches = _features(roster, self.pool, self.requirements)
+
+    def _expand(self, state):
+        """Scores of state + each pool candidate, as one vector (used candidates are -inf)"""
+        members, offense, weak, resist, req, bst = state
+        req_score = np.minimum(req + self.matches, self.need).sum(axis=1)
+        off_score = (offense | self.offense).sum(axis=1)
+        exposed = ((weak + self.weak) > (resist + self.resist)).sum(axis=1)
+        scores = (WEIGHT_REQUIREMENT * req_score + WEIGHT_OFFENSE * off_score
+                  - WEIGHT_DEFENSE * exposed + WEIGHT_STATS * (bst + self.bst))
+        scores[list(members)] = -np.inf
+        return scores
+
+    def _extend(self, state, candidate):
+        members, offense, weak, resist, req, bst = state
+        return (
+            members + (candidate,),
+            offense | self.offense[candidate],
+            weak + self.weak[candidate],
+            resist + self.resist[candidate],
+            req + self.matches[candidate],
+            bst + self.bst[candidate],
+        )
+
+    def solve(self, budget_ms=None, beam_width=None):
+        """Best team found (names) and its score, within the latency budget"""
+        budget = (budget_ms if budget_ms is not None else SOLVER_BUDGET_MS) / 1000.0
+        width = beam_width or SOLVER_BEAM_WIDTH
+        deadline = time.perf_counter() + budget
+        size = min(self.team_size, len(self.pool))
+
+        empty = ((), np.zeros(NO_TYPE, dtype=bool), np.zeros(NO_TYPE, dtype=np.int32),
+                 np.zeros(NO_TYPE, dtype=np.int32), np.zeros(len(self.requirements), dtype=np.int32), 0.0)
+        beam = [(0.0, empty)]
+        out_of_time = False
+
+        for depth in range(size):
+            if not out_of_time and time.perf_counter() > deadline:
+                out_of_time = True
+                logger.info(f"Team solver hit its {budget * 1000:.0f}ms budget at depth {depth}")
+            # Out of time: stop branching and finish the best team greedily
+            states = beam[:1] if out_of_time else beam
+            keep = 1 if out_of_time else width
+
+            scored = []
+            for _, state in states:
+                scores = self._expand(state)
+                top = np.argpartition(-scores, min(keep, len(scores) - 1))[:keep]
+                scored.extend((scores[c], state, c) for c in top if np.isfinite(scores[c]))
+
+            # Best extensions first; the same set of members reached twice is kept once
+            scored.sort(key=lambda item: -item[0])
+            beam, seen = [], set()
+            for score, state, candidate in scored:
+                key = frozenset(state[0] + (candidate,))
+                if key in seen:
+                    continue
+                seen.add(key)
+                beam.append((score, self._extend(state, candidate)))
+                if len(beam) >= keep:
+                    break
+            if not beam:
+                break
+
+        if not beam:
+            return [], 0.0
+        score, state = beam[0]
+        return [self.pool[i] for i in state[0]], float(score)
+
+
+def solve_team(roster, requirements, team_size=6, budget_ms=None, beam_width=None, fallback=None):
+    """
+    Pick team_size roster names that best satisfy requirements; returns (names, score).
+
+    fallback (e.g. the first-fit team) is returned instead when it scores
+    higher than what the search found, so the solver is never worse than it.
+    """
+    if not len(roster):
+        return [], 0.0
+    solver = TeamSolver(roster, requirements, team_size)
+    names, score = solver.solve(budget_ms, beam_width)
+    if fallback:
+        fallback_score = score_team(roster, requirements, fallback, team_size)
+        if fallback_score > score:
+            logger.debug(f"First-fit team beat the search ({fallback_score:.1f} > {score:.1f})")
+            return list(fallback), fallback_score
+    return names, score
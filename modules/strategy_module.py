@@ -1,62 +1,36 @@
 # modules/strategy_module.py
-from .info_module import get_pokemon_info
-
-# Module-level type advantages chart
-type_advantages = {
-    "normal": [],
-    "fire": ["grass", "ice", "bug", "steel"],
-    "water": ["fire", "ground", "rock"],
-    "electric": ["water", "flying"],
-    "grass": ["water", "ground", "rock"],
-    "ice": ["grass", "ground", "flying", "dragon"],
-    "fighting": ["normal", "ice", "rock", "dark", "steel"],
-    "poison": ["grass", "fairy"],
-    "ground": ["fire", "electric", "poison", "rock", "steel"],
-    "flying": ["grass", "fighting", "bug"],
-    "psychic": ["fighting", "poison"],
-    "bug": ["grass", "psychic", "dark"],
-    "rock": ["fire", "ice", "flying", "bug"],
-    "ghost": ["psychic", "ghost"],
-    "dragon": ["dragon"],
-    "dark": ["psychic", "ghost"],
-    "steel": ["ice", "rock", "fairy"],
-    "fairy": ["fighting", "dragon", "dark"]
-}
+import numpy as np
+from .info_module import get_pokemon_info, get_pokemon_infos_async
+from .prefetch_module import prefetch_pokemon
+from .roster_module import COUNTER_DEPTH, get_roster_index
+from .type_module import (COVERAGE, DEFENSE, SUPER_EFFECTIVE, TYPES, encode_many, matchup_score,
+                          super_effective_types, type_score)
+
+# Module-level type advantages chart (attacking type -> types it hits for 2x)
+type_advantages = SUPER_EFFECTIVE
 
 def get_type_advantage(type1, type2):
     """
-    Simplified single-type advantage:
-    +1 if type1 strong vs type2,
-    -1 if type1 weak vs type2,
+    Single-type advantage of type1 attacking type2:
+    +1 if super effective,
+    -1 if resisted,
+    IMMUNE_SCORE (-3) if type2 is immune,
      0 otherwise.
     """
-    # strong
-    if type2 in type_advantages.get(type1, []):
-        return 1
-    # weak (i.e. type2 is strong vs type1)
-    if type1 in type_advantages.get(type2, []):
-        return -1
-    return 0
+    return type_score(type1, type2)
 
 def calculate_type_advantages(attacker_types, defender_types):
     """
     Compare lists of attacker_types vs defender_types.
-    Sum up +1/-1 for each type matchup.
-    Returns integer score; higher means attacker has advantage.
+    Each attacking type is scored on its combined multiplier against the
+    whole defending typing (log2, so 4x = +2 and 0x = IMMUNE_SCORE), and the
+    scores are summed. Returns integer score; higher means attacker has advantage.
     """
-    score = 0
-    for atk_type in attacker_types:
-        for def_type in defender_types:
-            score += get_type_advantage(atk_type, def_type)
-    return score
+    return matchup_score(attacker_types, defender_types)
 
 def suggest_counter_types(opponent_types):
-    counter_types = set()
-    for opp_type in opponent_types:
-        for type_name, strong_against in type_advantages.items():
-            if opp_type in strong_against:
-                counter_types.add(type_name)
-    return list(counter_types)
+    """Types that hit the opponent's typing super effectively, strongest first"""
+    return super_effective_types(opponent_types)
 
 
 def strategy_decision(pokemon1_name, pokemon2_name):
@@ -66,7 +40,17 @@ def strategy_decision(pokemon1_name, pokemon2_name):
     """
     p1 = get_pokemon_info(pokemon1_name)
     p2 = get_pokemon_info(pokemon2_name)
+    return strategy_from_infos(p1, p2)
+
+
+async def strategy_decision_async(pokemon1_name, pokemon2_name):
+    """strategy_decision with both Pokémon fetched concurrently"""
+    p1, p2 = await get_pokemon_infos_async(pokemon1_name, pokemon2_name)
+    return strategy_from_infos(p1, p2)
 
+
+def strategy_from_infos(p1, p2):
+    """Strategy decision for two already-fetched Pokémon (get_pokemon_info results)"""
     if 'error' in p1 or 'error' in p2:
         return {"error": "One or both Pokémon not found."}
 
@@ -78,7 +62,7 @@ def strategy_decision(pokemon1_name, pokemon2_name):
         loser_types = p2['types']
         counter_suggestions = suggest_counter_types(loser_types)
     elif score2 > score1:
-       winner = p2['types']
+       winner = p2['name']
        loser_types = p1['types']
        counter_suggestions = suggest_counter_types(loser_types)
     else:
@@ -96,6 +80,86 @@ def strategy_decision(pokemon1_name, pokemon2_name):
 
     }
 
+# Largest team analyze_team accepts
+TEAM_ANALYSIS_LIMIT = 6
+
+
+def analyze_team(names):
+    """
+    Type analysis of a whole team in one pass over the precomputed
+    per-typing DEFENSE and COVERAGE tables:
+
+    shared_weaknesses   attacking types that hit two or more members super effectively
+    resistances         attacking types at least one member resists or is
+                        immune to, and which members
+    offensive_coverage  defending types at least one member's STAB hits super
+                        effectively, and which members
+    uncovered_threats   attacking types some member is weak to and no member resists
+    """
+    names = list(dict.fromkeys(n.lower().strip() for n in names))
+    fetched = prefetch_pokemon(names)
+    found = [n for n in names if n in fetched["records"]]
+
+    if not found:
+        return {"error": "None of the Pokémon were found.", "not_found": fetched["failed"]}
+
+    types = [fetched["records"][n]["types"] for n in found]
+    ids = encode_many(types)
+    defense = DEFENSE[ids[:, 0], ids[:, 1]]    # (members, attacking types)
+    coverage = COVERAGE[ids[:, 0], ids[:, 1]]  # (members, defending types)
+
+    weak = defense > 1.0
+    resists = defense < 1.0
+
+    def members(mask):
+        return [found[i] for i in np.flatnonzero(mask)]
+
+    weak_counts = weak.sum(axis=0)
+    shared = np.flatnonzero(weak_counts >= 2)
+    shared = shared[np.argsort(-weak_counts[shared], kind="stable")]
+    threats = np.flatnonzero(weak.any(axis=0) & ~resists.any(axis=0))
+    covered = coverage.any(axis=0)
+
+    return {
+        "pokemon": [{"name": n, "types": t} for n, t in zip(found, types)],
+        "shared_weaknesses": [{"type": TYPES[t], "members": members(weak[:, t])} for t in shared],
+        "resistances": {TYPES[t]: members(resists[:, t]) for t in np.flatnonzero(resists.any(axis=0))},
+        "offensive_coverage": {TYPES[t]: members(coverage[:, t]) for t in np.flatnonzero(covered)},
+        "not_covered": [TYPES[t] for t in np.flatnonzero(~covered)],
+        "uncovered_threats": [TYPES[t] for t in threats],
+        "not_found": fetched["failed"],
+    }
+
+def find_counters(pokemon_name, k=10):
+    """
+    The k roster Pokémon that best counter pokemon_name: a lookup in the
+    roster index's precomputed per-typing ranking (see RosterIndex.counter_table).
+    """
+    target = get_pokemon_info(pokemon_name)
+    if 'error' in target:
+        return target
+
+    index = get_roster_index()
+    k = max(1, min(k, COUNTER_DEPTH))
+    counters = []
+    for name, score in index.counters(target["types"], k, exclude={target["name"]}):
+        member = index.member(name)
+        counters.append({
+            "name": name,
+            "types": member["types"],
+            "role": member["role"],
+            "score": round(score, 3),
+            "type_score": matchup_score(member["types"], target["types"]),
+            "total": int(index.totals[index.position[name]]),
+        })
+
+    return {
+        "pokemon": target["name"],
+        "types": target["types"],
+        "weak_to": suggest_counter_types(target["types"]),
+        "counters": counters,
+    }
+
 # Testing block
 if __name__ == "__main__":
     print(strategy_decision("pikachu", "charizard"))
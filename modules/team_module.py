@@ -1,259 +1,187 @@
-import requests
-import re
+import os
+import queue
+import logging
+import threading
+import contextvars
 from collections import defaultdict
-from transformers import pipeline
+from .data_module import get_pokemon, get_pokemon_list
+from .roster_module import ROSTER_LIMIT, determine_pokemon_role, get_roster_index, roster_index_ready
+from .classifier_module import CLASSIFIER_MODE, CLASSIFIER_THRESHOLD, classify
+from .cache_module import LRUCache
+from .query_module import ALL_ROLES, ALL_TYPES, QueryParser
+from .solver_module import solve_team
+from .metrics_module import register_cache, span, timed_iter
 
-# Initialize zero-shot classifier
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+logger = logging.getLogger(__name__)
 
-# Universal definitions
-ALL_ROLES = ["attacker", "tank", "support", "balanced", "special attacker", "physical attacker"]
-ALL_TYPES = ["fire", "water", "grass", "electric", "psychic", "ice", "dragon", "dark", "fairy", 
-             "fighting", "poison", "ground", "flying", "bug", "rock", "ghost", "steel", "normal"]
+# "first-fit" takes the first roster match per requirement; "solver" searches
+# for the best-scoring team (requirements, type coverage, stats)
+TEAM_BUILDER_MODE = os.environ.get("TEAM_BUILDER_MODE", "first-fit")
+TEAM_BUILDER_MODES = ("first-fit", "solver")
 
-# Pokemon cache for performance
-pokemon_cache = {}
+# Parsed requirements keyed on the normalized description
+parse_cache = LRUCache(
+    maxsize=int(os.environ.get("PARSE_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("PARSE_CACHE_TTL", "3600")),
+)
+register_cache("parse", parse_cache)
 
-def get_pokemon_info_cached(name):
-    """Get Pokemon info with caching"""
-    if name in pokemon_cache:
-        return pokemon_cache[name]
-    
-    url = f"https://pokeapi.co/api/v2/pokemon/{name}"
-    try:
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            pokemon_cache[name] = response.json()
-            return pokemon_cache[name]
-    except:
-        pass
-    return None
+_query_parser = None
 
-def determine_pokemon_role(pokemon_info):
-    """Universal role determination based on stats"""
-    if not pokemon_info:
-        return "balanced"
-    
-    try:
-        stats = {stat['stat']['name']: stat['base_stat'] for stat in pokemon_info['stats']}
-        
-        hp = stats.get('hp', 0)
-        attack = stats.get('attack', 0)
-        defense = stats.get('defense', 0)
-        sp_attack = stats.get('special-attack', 0)
-        sp_defense = stats.get('special-defense', 0)
-        speed = stats.get('speed', 0)
-        
-        # Advanced role calculation
-        total_def = defense + sp_defense + hp
-        total_att = attack + sp_attack
-        
-        # Tank: High defensive stats
-        if (hp > 80 and defense > 70) or total_def > 220:
-            return "tank"
-        
-        # Special Attacker: High sp_attack
-        elif sp_attack > 90 or (sp_attack > attack and sp_attack > 70):
-            return "special attacker"
-        
-        # Physical Attacker: High attack
-        elif attack > 90 or (attack > sp_attack and attack > 70):
-            return "physical attacker"
-        
-        # General Attacker: Good offensive stats with speed
-        elif (total_att > 140 and speed > 60) or (attack > 65 and sp_attack > 65):
-            return "attacker"
-        
-        # Support: High HP or balanced defensive stats
-        elif hp > 75 or (defense + sp_defense > 120 and total_att < 140):
-            return "support"
-        
-        else:
-            return "balanced"
-            
-    except:
-        return "balanced"
+def get_query_parser():
+    """Query parser that knows every Pokemon name on the roster"""
+    global _query_parser
+    if _query_parser is None:
+        names = [p['name'] for p in get_all_pokemon_data()]
+        if not names:
+            return QueryParser()  # roster unavailable, retry next call
+        _query_parser = QueryParser(names)
+    return _query_parser
+
+def get_pokemon_info_cached(name):
+    """Get Pokemon info through the shared data layer (local index, PokeAPI on a miss)"""
+    return get_pokemon(name)
 
 def universal_query_parser(text):
     """Universal parser for ANY query format"""
-    text = text.lower().strip()
-    print(f"Parsing query: '{text}'")
-    
-    requirements = defaultdict(int)
-    
-    # STEP 1: Handle numbers + roles/types patterns
-    patterns = [
-        r"(\d+)\s+(tank|tanks|attacker|attackers|support|supports|supporter|supporters|balanced|special\s*attacker|physical\s*attacker)",
-        r"(\d+)\s+(fire|water|grass|electric|psychic|ice|dragon|dark|fairy|fighting|poison|ground|flying|bug|rock|ghost|steel|normal)\s*(type|types|pokemon|pokémon)?",
-        r"(?:want|need|give\s*me|get\s*me)\s+(\d+)\s+(tank|tanks|attacker|attackers|support|supports|supporter|supporters|balanced|special\s*attacker|physical\s*attacker)",
-        r"(?:want|need|give\s*me|get\s*me)\s+(\d+)\s+(fire|water|grass|electric|psychic|ice|dragon|dark|fairy|fighting|poison|ground|flying|bug|rock|ghost|steel|normal)",
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, text)
-        for match in matches:
-            if len(match) >= 2:
-                count = int(match[0])
-                category = match[1].strip().replace('s', '').replace('er', '')  # normalize
-                
-                # Map to standard categories
-                if category in ['tank']:
-                    requirements['tank'] += count
-                elif category in ['attack', 'attacker']:
-                    requirements['attacker'] += count
-                elif category in ['support', 'supporter']:
-                    requirements['support'] += count
-                elif category in ['balanced']:
-                    requirements['balanced'] += count
-                elif category in ['special attack', 'special attacker']:
-                    requirements['special attacker'] += count
-                elif category in ['physical attack', 'physical attacker']:
-                    requirements['physical attacker'] += count
-                elif category in ALL_TYPES:
-                    requirements[category] += count
-    
-    # STEP 2: Handle specific Pokemon names
-    pokemon_name_pattern = r"\b(pikachu|charizard|blastoise|venusaur|alakazam|gengar|dragonite|mewtwo|mew|articuno|zapdos|moltres)\b"
-    pokemon_names = re.findall(pokemon_name_pattern, text)
-    for name in pokemon_names:
-        requirements[name] += 1
-    
-    # STEP 3: Handle general requests without numbers
-    if not requirements:
-        # Check for role mentions without numbers
-        if any(word in text for word in ['tank', 'tanks']):
-            requirements['tank'] = 6
-        elif any(word in text for word in ['attack', 'attacker', 'attackers']):
-            requirements['attacker'] = 6
-        elif any(word in text for word in ['support', 'supporter', 'supporters']):
-            requirements['support'] = 6
-        elif any(word in text for word in ['balanced']):
-            requirements['balanced'] = 6
+    with span("parse"):
+        text = " ".join(text.lower().split())
+        cached = parse_cache.get(text)
+        if cached is not None:
+            return defaultdict(int, cached)
         
-        # Check for type mentions
-        for poke_type in ALL_TYPES:
-            if poke_type in text:
-                requirements[poke_type] = 6
-                break
+        # STEPS 1-3: counts, roles, types and Pokemon names in one pass
+        requirements = get_query_parser().parse(text)
+    cacheable = True
     
     # STEP 4: Use NLP as fallback
     if not requirements:
         try:
-            result = classifier(text, ALL_ROLES + ALL_TYPES)
-            best_label = result['labels'][0] if result['scores'][0] > 0.3 else 'balanced'
+            with span("classify"):
+                result = classify(text, ALL_ROLES + ALL_TYPES)
+            best_label = result['labels'][0] if result['scores'][0] > CLASSIFIER_THRESHOLD else 'balanced'
             requirements[best_label] = 6
-        except:
+        except Exception as e:
+            if CLASSIFIER_MODE != "off":
+                logger.warning(f"Classifier unavailable, defaulting to a balanced team: {e}")
             requirements['balanced'] = 6
+            cacheable = False  # don't pin a classifier outage into the cache
     
-    print(f"Parsed requirements: {dict(requirements)}")
+    logger.debug("Parsed %r as %s", text, dict(requirements))
+    if cacheable:
+        parse_cache.set(text, dict(requirements))
     return requirements
 
 def get_all_pokemon_data():
     """Get all Pokemon data efficiently"""
-    url = "https://pokeapi.co/api/v2/pokemon?limit=150"
-    try:
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            return response.json().get('results', [])
-    except:
-        pass
-    return []
+    return get_pokemon_list(ROSTER_LIMIT)
 
-def build_team_universal(description, team_size=6):
-    """Universal team builder for ANY query"""
-    print(f"\n🔥 Building team for: '{description}'")
+def load_roster_events():
+    """
+    Yield progress events while the roster index loads, then the index.
+
+    Events are ("progress", {...}) tuples; the last item is ("roster", index).
+    Loading runs on a helper thread so progress can be reported as it happens.
+    """
+    if roster_index_ready():
+        yield "roster", get_roster_index()
+        return
+
+    events = queue.Queue()
+    def progress(done, total, name, ok):
+        events.put(("progress", {"done": done, "total": total}))
+    def load():
+        try:
+            events.put(("roster", get_roster_index(progress=progress)))
+        except Exception as e:
+            events.put(("error", e))
+    # Carry the request context (metrics route label) into the loader thread
+    threading.Thread(target=contextvars.copy_context().run, args=(load,), daemon=True).start()
+
+    while True:
+        kind, payload = events.get()
+        # Coalesce a burst of progress updates into the latest one
+        while kind == "progress" and not events.empty():
+            kind, payload = events.get()
+        if kind == "error":
+            raise payload
+        yield kind, payload
+        if kind == "roster":
+            return
+
+def iter_build_team_universal(description, team_size=6):
+    """
+    Universal team builder for ANY query, as a stream of events:
+    {"event": "parsed"}, {"event": "progress"} while the roster loads,
+    {"event": "member"} per selected Pokemon, and {"event": "done"} with the team.
+    """
+    logger.debug("Building team for: %r", description)
     
     # Parse requirements
     requirements = universal_query_parser(description)
+    yield {"event": "parsed", "requirements": dict(requirements)}
     
-    # Get Pokemon list
-    all_pokemons = get_all_pokemon_data()
-    if not all_pokemons:
-        return []
+    # Get the prebuilt roster index
+    roster = None
+    for kind, payload in load_roster_events():
+        if kind == "progress":
+            yield {"event": "progress", "stage": "fetch", **payload}
+        else:
+            roster = payload
+    if not len(roster):
+        yield {"event": "done", "team": []}
+        return
     
     selected_team = []
+    for pokemon_obj, requirement in timed_iter("select", _select_first_fit(roster, requirements, team_size)):
+        selected_team.append(pokemon_obj)
+        yield {"event": "member", "member": pokemon_obj, "requirement": requirement}
+    
+    yield {"event": "done", "team": selected_team}
+
+def _select_first_fit(roster, requirements, team_size):
+    """Yield (member, requirement) picks: first roster matches per requirement, then padding"""
+    selected = 0
     used_names = set()
     
     # PHASE 1: Fill specific requirements
     for requirement, needed_count in requirements.items():
         found_count = 0
         
-        for pokemon_data in all_pokemons:
-            if len(selected_team) >= team_size or found_count >= needed_count:
-                break
-                
-            name = pokemon_data['name']
-            if name in used_names:
-                continue
-            
-            # Get Pokemon details
-            info = get_pokemon_info_cached(name)
-            if not info:
-                continue
-            
-            # Extract Pokemon attributes
-            p_types = [t['type']['name'] for t in info['types']]
-            p_role = determine_pokemon_role(info)
-            
-            # Check if Pokemon matches requirement
-            match = False
-            
-            if requirement == name:  # Specific Pokemon name
-                match = True
-            elif requirement in ALL_ROLES:  # Role requirement
-                if requirement == p_role:
-                    match = True
-                elif requirement == 'attacker' and p_role in ['attacker', 'special attacker', 'physical attacker']:
-                    match = True
-            elif requirement in ALL_TYPES:  # Type requirement
-                if requirement in p_types:
-                    match = True
-            
-            if match:
-                pokemon_obj = {
-                    "name": name,
-                    "types": p_types,
-                    "role": p_role,
-                    "stats": {stat['stat']['name']: stat['base_stat'] for stat in info['stats']}
-                }
-                selected_team.append(pokemon_obj)
-                used_names.add(name)
-                found_count += 1
-                print(f"✅ Selected {name.title()} ({p_role}) for {requirement}")
-    
-    # PHASE 2: Fill remaining slots with balanced Pokemon
-    while len(selected_team) < team_size:
-        filled = False
-        for pokemon_data in all_pokemons:
-            if len(selected_team) >= team_size:
+        for name in roster.candidates(requirement):
+            if selected >= team_size or found_count >= needed_count:
                 break
-                
-            name = pokemon_data['name']
             if name in used_names:
                 continue
             
-            info = get_pokemon_info_cached(name)
-            if not info:
-                continue
-            
-            p_types = [t['type']['name'] for t in info['types']]
-            p_role = determine_pokemon_role(info)
-            
-            pokemon_obj = {
-                "name": name,
-                "types": p_types,
-                "role": p_role,
-                "stats": {stat['stat']['name']: stat['base_stat'] for stat in info['stats']}
-            }
-            selected_team.append(pokemon_obj)
+            pokemon_obj = roster.member(name)
+            selected += 1
             used_names.add(name)
-            filled = True
+            found_count += 1
+            logger.debug("Selected %s (%s) for %s", name, pokemon_obj['role'], requirement)
+            yield pokemon_obj, requirement
+    
+    # PHASE 2: Fill remaining slots in roster order
+    for name in roster.order:
+        if selected >= team_size:
             break
+        if name in used_names:
+            continue
         
-        if not filled:  # Prevent infinite loop
-            break
-    
-    return selected_team
+        pokemon_obj = roster.member(name)
+        selected += 1
+        used_names.add(name)
+        yield pokemon_obj, None
+
+def build_team_universal(description, team_size=6):
+    """Universal team builder for ANY query"""
+    return _final_team(iter_build_team_universal(description, team_size))
+
+def _final_team(events):
+    for event in events:
+        if event["event"] == "done":
+            return event["team"]
+    return []
 
 def display_team_results(team, query):
     """Universal team display"""
@@ -279,10 +207,42 @@ def display_team_results(team, query):
     print(f"📊 Type Distribution: {dict(type_distribution)}")
     return role_distribution, type_distribution
 
+def iter_build_team_solver(description, team_size=6, budget_ms=None):
+    """Solver team builder as a stream of events (see iter_build_team_universal)"""
+    requirements = universal_query_parser(description)
+    yield {"event": "parsed", "requirements": dict(requirements)}
+    
+    roster = None
+    for kind, payload in load_roster_events():
+        if kind == "progress":
+            yield {"event": "progress", "stage": "fetch", **payload}
+        else:
+            roster = payload
+    
+    with span("select"):
+        first_fit = [member["name"] for member, _ in _select_first_fit(roster, requirements, team_size)]
+        names, score = solve_team(roster, requirements, team_size, budget_ms, fallback=first_fit)
+        team = [roster.member(name) for name in names]
+    logger.debug("Solver picked %s (score %.1f)", names, score)
+    for pokemon_obj in team:
+        yield {"event": "member", "member": pokemon_obj, "requirement": None}
+    yield {"event": "done", "team": team}
+
+def build_team_solver(description, team_size=6, budget_ms=None):
+    """Team builder that scores candidate teams instead of taking the first match"""
+    return _final_team(iter_build_team_solver(description, team_size, budget_ms))
+
+def iter_build_team(description, team_size=6, mode=None):
+    """build_team as a stream of events, for streaming responses"""
+    mode = mode or TEAM_BUILDER_MODE
+    if mode == "solver":
+        return iter_build_team_solver(description, team_size)
+    return iter_build_team_universal(description, team_size)
+
 # Main function to replace your build_team
-def build_team(description, team_size=6):
+def build_team(description, team_size=6, mode=None):
     """Main function - replaces your existing build_team"""
-    return build_team_universal(description, team_size)
+    return _final_team(iter_build_team(description, team_size, mode))
 
 # Testing function
 def test_all_queries():
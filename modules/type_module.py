@@ -0,0 +1,229 @@
+"""
+Type-effectiveness engine.
+
+Holds the full 18x18 chart as NumPy arrays (0, 0.5, 1 and 2x, including
+resistances and immunities) so matchups can be scored one pair at a time
+or for whole batches of Pokemon in a single vectorized call.
+
+A Pokemon's typing is encoded as two type ids; single-typed Pokemon use
+NO_TYPE in the second slot, which is neutral (1x, score 0) everywhere.
+"""
+import numpy as np
+
+TYPES = ["normal", "fighting", "flying", "poison", "ground", "rock", "bug", "ghost", "steel",
+         "fire", "water", "grass", "electric", "psychic", "ice", "dragon", "dark", "fairy"]
+TYPE_INDEX = {t: i for i, t in enumerate(TYPES)}
+NO_TYPE = len(TYPES)
+
+# attacking type -> defending types it hits for 2x
+SUPER_EFFECTIVE = {
+    "normal": [],
+    "fire": ["grass", "ice", "bug", "steel"],
+    "water": ["fire", "ground", "rock"],
+    "electric": ["water", "flying"],
+    "grass": ["water", "ground", "rock"],
+    "ice": ["grass", "ground", "flying", "dragon"],
+    "fighting": ["normal", "ice", "rock", "dark", "steel"],
+    "poison": ["grass", "fairy"],
+    "ground": ["fire", "electric", "poison", "rock", "steel"],
+    "flying": ["grass", "fighting", "bug"],
+    "psychic": ["fighting", "poison"],
+    "bug": ["grass", "psychic", "dark"],
+    "rock": ["fire", "ice", "flying", "bug"],
+    "ghost": ["psychic", "ghost"],
+    "dragon": ["dragon"],
+    "dark": ["psychic", "ghost"],
+    "steel": ["ice", "rock", "fairy"],
+    "fairy": ["fighting", "dragon", "dark"]
+}
+
+# attacking type -> defending types that resist it (0.5x)
+NOT_VERY_EFFECTIVE = {
+    "normal": ["rock", "steel"],
+    "fire": ["fire", "water", "rock", "dragon"],
+    "water": ["water", "grass", "dragon"],
+    "electric": ["electric", "grass", "dragon"],
+    "grass": ["fire", "grass", "poison", "flying", "bug", "dragon", "steel"],
+    "ice": ["fire", "water", "ice", "steel"],
+    "fighting": ["poison", "flying", "psychic", "bug", "fairy"],
+    "poison": ["poison", "ground", "rock", "ghost"],
+    "ground": ["grass", "bug"],
+    "flying": ["electric", "rock", "steel"],
+    "psychic": ["psychic", "steel"],
+    "bug": ["fire", "fighting", "poison", "flying", "ghost", "steel", "fairy"],
+    "rock": ["fighting", "ground", "steel"],
+    "ghost": ["dark"],
+    "dragon": ["steel"],
+    "dark": ["fighting", "dark", "fairy"],
+    "steel": ["fire", "water", "electric", "steel"],
+    "fairy": ["fire", "poison", "steel"]
+}
+
+# attacking type -> defending types that are immune (0x)
+NO_EFFECT = {
+    "normal": ["ghost"],
+    "electric": ["ground"],
+    "fighting": ["ghost"],
+    "poison": ["steel"],
+    "ground": ["flying"],
+    "psychic": ["dark"],
+    "ghost": ["normal"],
+    "dragon": ["fairy"],
+}
+
+# Score of a 0x hit; log2 of the multiplier would be -inf, so an immunity
+# counts as one step below a double resistance (0.25x, -2)
+IMMUNE_SCORE = -3
+
+
+def _build_tables():
+    size = len(TYPES) + 1  # extra row/column for NO_TYPE
+    multipliers = np.ones((size, size), dtype=np.float32)
+    for chart, value in ((SUPER_EFFECTIVE, 2.0), (NOT_VERY_EFFECTIVE, 0.5), (NO_EFFECT, 0.0)):
+        for attacker, defenders in chart.items():
+            for defender in defenders:
+                multipliers[TYPE_INDEX[attacker], TYPE_INDEX[defender]] = value
+
+    scores = np.zeros((size, size), dtype=np.int8)
+    scores[multipliers == 2.0] = 1
+    scores[multipliers == 0.5] = -1
+    scores[multipliers == 0.0] = IMMUNE_SCORE
+    return multipliers, scores
+
+
+# EFFECTIVENESS[a, d] is the damage multiplier of attacking type a on defending type d
+EFFECTIVENESS, SCORES = _build_tables()
+
+
+def _build_matchup_scores():
+    # The product rule: a hit's multiplier on a dual typing is the product of
+    # the two single-type multipliers, scored as its log2 (4x = +2, 0.25x = -2)
+    combined = EFFECTIVENESS[:, :, None] * EFFECTIVENESS[:, None, :]  # [attack, t1, t2]
+    steps = np.log2(np.where(combined > 0, combined, 1.0))
+    return np.where(combined > 0, steps, IMMUNE_SCORE).astype(np.int8)
+
+
+# MATCHUP_SCORES[a, t1, t2] scores attacking type a on the typing (t1, t2);
+# a NO_TYPE attacker scores 0 against everything
+MATCHUP_SCORES = _build_matchup_scores()
+
+
+def _build_combo_tables():
+    # Indexed by an encoded typing (id, id), NO_TYPE included, so a team's
+    # (N, 2) array selects all its rows in one fancy-indexing step
+    attacking = EFFECTIVENESS[:NO_TYPE]
+    defense = attacking[:, :, None] * attacking[:, None, :]  # [attack, t1, t2]
+    defense = np.ascontiguousarray(defense.transpose(1, 2, 0))
+
+    # A typing's STAB hits: either real type super effective on the defending type
+    hits = attacking[:, :NO_TYPE] > 1.0
+    hits = np.vstack([hits, np.zeros((1, NO_TYPE), dtype=bool)])
+    coverage = hits[:, None, :] | hits[None, :, :]
+    return defense, coverage
+
+
+def _build_typings():
+    # Every distinct typing: 18 single types, then the 153 unordered pairs
+    typings = [(t, NO_TYPE) for t in range(NO_TYPE)]
+    typings += [(a, b) for a in range(NO_TYPE) for b in range(a + 1, NO_TYPE)]
+    typings = np.array(typings, dtype=np.intp)
+    index = np.full((NO_TYPE + 1, NO_TYPE + 1), -1, dtype=np.intp)
+    index[typings[:, 0], typings[:, 1]] = np.arange(len(typings))
+    index[typings[:, 1], typings[:, 0]] = np.arange(len(typings))
+    return typings, index
+
+
+# TYPINGS is the (171, 2) array of every typing; TYPING_INDEX[t1, t2] is its row (either order)
+TYPINGS, TYPING_INDEX = _build_typings()
+
+# DEFENSE[t1, t2] is the (18,) multipliers of every attacking type on the typing (t1, t2);
+# COVERAGE[t1, t2] marks the (18,) defending types its STAB hits super effectively
+DEFENSE, COVERAGE = _build_combo_tables()
+
+
+def encode_types(types):
+    """Type names -> (id, id) pair, padded with NO_TYPE"""
+    ids = [TYPE_INDEX[t] for t in types[:2]]
+    while len(ids) < 2:
+        ids.append(NO_TYPE)
+    return ids
+
+
+def encode_many(type_lists):
+    """List of type-name lists -> (N, 2) int array"""
+    return np.array([encode_types(types) for types in type_lists], dtype=np.intp).reshape(-1, 2)
+
+
+def effectiveness(attack_type, defender_types):
+    """Damage multiplier of one attacking type against a (possibly dual) typing"""
+    row = EFFECTIVENESS[TYPE_INDEX[attack_type]]
+    return float(row[encode_types(defender_types)].prod())
+
+
+def type_score(type1, type2):
+    """Single-type matchup score: +1 super effective, -1 resisted, IMMUNE_SCORE immune, 0 neutral"""
+    return int(SCORES[TYPE_INDEX[type1], TYPE_INDEX[type2]])
+
+
+def matchup_score(attacker_types, defender_types):
+    """
+    Type score of attacker_types hitting defender_types: for each attacking
+    type, log2 of its combined multiplier on the whole typing (IMMUNE_SCORE
+    for 0x), summed over the attacker's types.
+    """
+    a = encode_types(attacker_types)
+    d = encode_types(defender_types)
+    return int(MATCHUP_SCORES[a, d[0], d[1]].sum())
+
+
+def matchup_scores(attackers, defenders):
+    """
+    Score many pairings at once.
+
+    attackers and defenders are equal-length lists of type lists (or
+    encoded (N, 2) arrays); returns an (N,) array where entry i is
+    matchup_score(attackers[i], defenders[i]).
+    """
+    a = attackers if isinstance(attackers, np.ndarray) else encode_many(attackers)
+    d = defenders if isinstance(defenders, np.ndarray) else encode_many(defenders)
+    return MATCHUP_SCORES[a, d[:, :1], d[:, 1:]].sum(axis=1, dtype=np.int32)
+
+
+def matchup_table(attackers, defenders):
+    """
+    Score every attacker against every defender.
+
+    Returns an (N, M) int array where entry [i, j] is
+    matchup_score(attackers[i], defenders[j]).
+    """
+    a = attackers if isinstance(attackers, np.ndarray) else encode_many(attackers)
+    d = defenders if isinstance(defenders, np.ndarray) else encode_many(defenders)
+    return MATCHUP_SCORES[a[:, None, :], d[None, :, :1], d[None, :, 1:]].sum(axis=2, dtype=np.int32)
+
+
+def best_multiplier_table(attackers, defenders):
+    """
+    Best STAB multiplier of each attacker against each defender.
+
+    Returns an (N, M) float array: for each pairing, the highest damage
+    multiplier any of the attacker's types achieves on the defender's typing.
+    """
+    a = attackers if isinstance(attackers, np.ndarray) else encode_many(attackers)
+    d = defenders if isinstance(defenders, np.ndarray) else encode_many(defenders)
+    per_type = EFFECTIVENESS[a[:, :, None, None], d[None, None, :, :]].prod(axis=3)
+    # A NO_TYPE slot isn't a real attacking type, so it mustn't count as a 1x option
+    per_type[:, 1, :][a[:, 1] == NO_TYPE] = 0.0
+    return per_type.max(axis=1)
+
+
+def typing_id(types):
+    """Row of TYPINGS for a list of type names"""
+    a, b = encode_types(types)
+    return int(TYPING_INDEX[a, b])
+
+
+def super_effective_types(defender_types):
+    """Attacking types that hit defender_types for more than 1x, strongest first"""
+    column = EFFECTIVENESS[:NO_TYPE, encode_types(defender_types)].prod(axis=1)
+    order = np.argsort(-column, kind="stable")
+    return [TYPES[i] for i in order if column[i] > 1.0]
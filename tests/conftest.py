@@ -0,0 +1,40 @@
+import logging
+import threading
+
+import pytest
+
+from bench.stub_pokeapi import start_stub_server
+
+
+@pytest.fixture(scope="session")
+def stub():
+    """Local PokeAPI stub serving the bench fixtures"""
+    server, stub, base_url = start_stub_server(port=0)
+    yield stub, base_url
+    server.shutdown()
+
+
+@pytest.fixture
+def data_layer(stub, tmp_path, monkeypatch):
+    """The data layer pointed at the stub, with a fresh index, shared cache and process cache"""
+    from modules import data_module, pokeapi_module
+    from modules.cache_module import LRUCache
+    from modules.shared_cache_module import open_store
+
+    monkeypatch.setattr(pokeapi_module, "pokeapi", pokeapi_module.UpstreamClient(stub[1], backoff=0))
+    monkeypatch.setattr(data_module, "INDEX_PATH", str(tmp_path / "index.db"))
+    monkeypatch.setattr(data_module, "_local", threading.local())
+    monkeypatch.setattr(data_module, "shared_cache", open_store(f"sqlite:///{tmp_path / 'index.db'}"))
+    monkeypatch.setattr(data_module, "pokemon_cache", LRUCache(64))
+    data_module.set_snapshot(None)
+    return data_module
+
+
+@pytest.fixture
+def client(data_layer, monkeypatch, tmp_path):
+    """Flask test client for the app, backed by data_layer"""
+    monkeypatch.chdir(tmp_path)  # app.py logs to ./mcp.log
+    import app
+
+    logging.getLogger().setLevel(logging.WARNING)
+    return app.app.test_client()
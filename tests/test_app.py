@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+
+def test_compare(client):
+    response = client.post('/compare', json={'pokemon1': 'pikachu', 'pokemon2': 'charizard'})
+    assert response.status_code == 200
+    assert response.get_json()['name'] == ['pikachu', 'charizard']
+
+
+def test_compare_not_found_is_404(client):
+    response = client.post('/compare', json={'pokemon1': 'pikachu', 'pokemon2': 'notapokemon'})
+    assert response.status_code == 404
+    assert 'error' in response.get_json()
+
+
+def test_cacheable_get_has_etag_and_revalidates(client):
+    response = client.get('/compare/pikachu/charizard')
+    assert response.status_code == 200
+    assert response.cache_control.public and response.headers.get('ETag')
+    again = client.get('/compare/pikachu/charizard', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_not_found_get_is_never_cached(client):
+    for path in ('/compare/pikachu/notapokemon', '/info/notapokemon', '/strategy/pikachu/notapokemon'):
+        response = client.get(path)
+        assert response.status_code == 404, path
+        assert response.cache_control.no_store, path
+        assert not response.cache_control.public, path
+        assert 'ETag' not in response.headers, path
+
+
+@pytest.mark.parametrize('names', [5, 'pikachu', {'a': 1}, [1, 2], ['pikachu', None], ['pikachu']])
+def test_compare_batch_rejects_bad_name_lists(client, names):
+    response = client.post('/compare/batch', json={'names': names})
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_compare_batch(client):
+    response = client.post('/compare/batch', json={'names': ['pikachu', 'charizard', 'gyarados']})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('names', [5, [], [1, 2], ['pikachu', None], ['pikachu'] * 7])
+def test_team_analyze_rejects_bad_name_lists(client, names):
+    response = client.post('/team/analyze', json={'names': names})
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_wildcard_if_none_match_is_ignored(client):
+    response = client.get('/info/doesnotexist', headers={'If-None-Match': '*'})
+    assert response.status_code == 404
+    response = client.get('/info/pikachu', headers={'If-None-Match': '*'})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert client.get('/info/pikachu', headers={'If-None-Match': f'W/{etag}'}).status_code == 304
+    assert client.get('/info/pikachu', headers={'If-None-Match': f'"other", {etag}'}).status_code == 304
+
+
+@pytest.mark.parametrize('accept', ['application/x-ndjson', 'text/event-stream'])
+def test_team_stream_reports_failures_in_band(client, monkeypatch, accept):
+    import app
+
+    def failing(*args, **kwargs):
+        yield {'event': 'parsed', 'requirements': {}}
+        raise RuntimeError('roster unavailable')
+
+    encoded = []
+    dumps = app.app.json.dumps
+    monkeypatch.setattr(app, 'iter_build_team', failing)
+    monkeypatch.setattr(app.app.json, 'dumps', lambda obj, **kwargs: encoded.append(obj) or dumps(obj, **kwargs))
+    response = client.post('/team/stream', json={'description': '2 tanks'}, headers={'Accept': accept})
+    last = response.get_data(as_text=True).strip().splitlines()[-1]
+    error = {'event': 'error', 'error': 'Team building failed'}
+    assert response.status_code == 200
+    assert json.loads(last.removeprefix('data: ')) == error
+    # Same encoder as the rest of the stream
+    assert encoded[-1] == error
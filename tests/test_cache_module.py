@@ -0,0 +1,123 @@
+import time
+import threading
+
+import pytest
+
+from modules.cache_module import LRUCache, SingleFlight
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=3)
+    for key in "abc":
+        cache.set(key, key.upper())
+    assert cache.get("a") == "A"  # a is now the most recent
+    cache.set("d", "D")
+    assert "b" not in cache
+    assert [k for k in "acd" if k in cache] == ["a", "c", "d"]
+    cache.set("c", "C2")  # overwriting refreshes recency too
+    cache.set("e", "E")
+    assert "a" not in cache and cache.get("c") == "C2"
+    assert len(cache) == 3
+    assert cache.evictions == 2
+
+
+def test_lru_ttl_expires_on_read():
+    cache = LRUCache(maxsize=10, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.08)
+    assert cache.get("a", "gone") == "gone"
+    assert "a" not in cache
+    assert cache.expirations == 1
+
+
+def test_lru_without_ttl_keeps_entries():
+    cache = LRUCache(maxsize=10)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    assert cache.get("a") == 1
+
+
+def test_lru_stats():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    cache.get("c")
+    cache.get("a")
+    assert cache.pop("b") == 2 and cache.pop("b", "none") == "none"
+    assert cache.stats() == {"size": 1, "maxsize": 2, "ttl": 60, "hits": 1, "misses": 1,
+                             "evictions": 1, "expirations": 0}
+    cache.clear()
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_none_values_are_cached():
+    cache = LRUCache()
+    cache.set("a", None)
+    assert "a" in cache and cache.get("a", "default") is None
+
+
+def run_together(flight, key, fn, callers):
+    """Start a leader, wait until it is running fn, then add followers; returns (results, errors)"""
+    started, release = threading.Event(), threading.Event()
+    results, errors = [], []
+
+    def body():
+        started.set()
+        release.wait(5)
+        return fn()
+
+    def call():
+        try:
+            results.append(flight.do(key, body))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.coalesced < callers - 1 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    results, errors = run_together(flight, "pikachu", lambda: calls.append(1) or object(), 5)
+    assert len(calls) == 1
+    assert errors == [] and len(results) == 5
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 4}
+
+
+def test_single_flight_raises_to_every_waiter():
+    flight = SingleFlight()
+    error = RuntimeError("upstream down")
+
+    def fail():
+        raise error
+
+    results, errors = run_together(flight, "pikachu", fail, 4)
+    assert results == []
+    assert errors == [error] * 4
+    assert flight.in_flight() == 0
+    # The failed call is gone; the next one runs again
+    assert flight.do("pikachu", lambda: "ok") == "ok"
+    assert flight.executed == 2
+
+
+def test_single_flight_keys_are_independent():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    with pytest.raises(KeyError):
+        flight.do("c", lambda: {}["missing"])
+    assert flight.stats() == {"in_flight": 0, "executed": 3, "coalesced": 0}
@@ -0,0 +1,52 @@
+import time
+
+from bench.stub_pokeapi import load_fixtures
+from modules import data_module
+from modules.cache_module import LRUCache
+from modules.pokeapi_module import slim_pokemon
+
+
+def test_process_cache_expires_with_shared_ttl(data_layer, stub, monkeypatch):
+    monkeypatch.setattr(data_layer, "SHARED_CACHE_TTL", 0.05)
+    monkeypatch.setattr(data_layer, "pokemon_cache", LRUCache(64, ttl=0.05))
+    assert data_layer.get_pokemon("pikachu")["name"] == "pikachu"
+    served = stub[0].request_count
+    assert data_layer.get_pokemon("pikachu")["name"] == "pikachu"
+    assert stub[0].request_count == served
+    time.sleep(0.1)
+    assert data_layer.get_pokemon("pikachu")["name"] == "pikachu"
+    assert stub[0].request_count > served
+
+
+def test_stale_record_is_not_kept_in_process_cache(data_layer, stub, monkeypatch):
+    monkeypatch.setattr(data_layer, "SHARED_CACHE_TTL", 0.05)
+    data_layer.get_pokemon("pikachu")
+    data_layer.pokemon_cache.clear()
+    time.sleep(0.1)
+    monkeypatch.setattr(stub[0], "error_rate", 1.0)
+    assert data_layer.get_pokemon("pikachu")["name"] == "pikachu"
+    assert data_layer.pokemon_cache.get("pikachu") is None
+    failed = stub[0].error_count
+    assert data_layer.get_pokemon("pikachu")["name"] == "pikachu"
+    assert stub[0].error_count > failed
+
+
+def test_record_bytes_round_trip():
+    for record in (slim_pokemon(p) for p in load_fixtures()):
+        packed = data_module.PokemonRecord(record).to_bytes()
+        assert data_module.PokemonRecord.from_bytes(packed).to_dict() == record
+        assert data_module.PokemonRecord.from_bytes(memoryview(packed)).to_dict() == record
+
+
+def test_record_bytes_edge_cases():
+    record = {
+        "name": "farfetch'd-galar", "id": 10166, "height": 8, "weight": 420, "base_experience": None,
+        "types": ["water", "fire"], "abilities": [],  # fire sorts first in TYPES
+        "stats": [{"base_stat": 255, "effort": 3, "stat": {"name": name}} for name in data_module.STAT_NAMES],
+    }
+    restored = data_module.PokemonRecord.from_bytes(data_module.PokemonRecord(record).to_bytes()).to_dict()
+    assert restored == record
+    assert restored["types"] == ["water", "fire"]
+    assert restored["base_experience"] is None
+    assert data_module.PokemonRecord.from_bytes(
+        data_module.PokemonRecord(dict(record, base_experience=0)).to_bytes()).to_dict()["base_experience"] == 0
@@ -0,0 +1,22 @@
+import os
+
+import numpy as np
+
+from modules.intent_module import IntentMatcher
+
+
+class OneHotMatcher(IntentMatcher):
+    """IntentMatcher with a deterministic embedding in place of the sentence model"""
+
+    def embed(self, texts):
+        return np.array([[float(len(text) == n) for n in range(64)] for text in texts], dtype=np.float32)
+
+
+def test_truncated_embeddings_file_is_rebuilt(tmp_path):
+    path = tmp_path / "intent_embeddings.npz"
+    path.write_bytes(b"PK\x03\x04 truncated")
+    matcher = OneHotMatcher(path=str(path), labels=["tank", "fire"])
+    assert matcher.labels == ["tank", "fire"]
+    with np.load(path) as stored:
+        assert stored["embeddings"].shape[1] == 64
+    assert os.listdir(tmp_path) == ["intent_embeddings.npz"]
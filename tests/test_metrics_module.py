@@ -0,0 +1,54 @@
+import time
+import threading
+
+from modules import data_module, metrics_module, pokeapi_module
+from modules.cache_module import SingleFlight
+from modules.metrics_module import register_flight, render_metrics
+
+
+def sample(text, name, flight):
+    prefix = f'{name}{{flight="{flight}"}} '
+    values = [line[len(prefix):] for line in text.splitlines() if line.startswith(prefix)]
+    assert len(values) == 1, (name, flight)
+    return int(values[0])
+
+
+def test_app_flights_are_exported():
+    text = render_metrics()
+    assert "# TYPE pokeapi_singleflight_in_flight gauge" in text
+    assert "# TYPE pokeapi_singleflight_coalesced_total counter" in text
+    for flight, group in (("pokemon", pokeapi_module.pokemon_flight), ("list", pokeapi_module.list_flight),
+                          ("index_miss", data_module.miss_flight)):
+        assert sample(text, "pokeapi_singleflight_executed_total", flight) == group.executed
+
+
+def test_coalesced_calls_are_counted(monkeypatch):
+    monkeypatch.setattr(metrics_module, "_flights", dict(metrics_module._flights))
+    flight = SingleFlight()
+    register_flight("test", flight)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 1
+
+    leader = threading.Thread(target=flight.do, args=("key", slow))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=flight.do, args=("key", slow)) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.coalesced < 3 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert sample(render_metrics(), "pokeapi_singleflight_in_flight", "test") == 1
+
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    text = render_metrics()
+    assert sample(text, "pokeapi_singleflight_in_flight", "test") == 0
+    assert sample(text, "pokeapi_singleflight_executed_total", "test") == 1
+    assert sample(text, "pokeapi_singleflight_coalesced_total", "test") == 3
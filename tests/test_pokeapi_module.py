@@ -0,0 +1,159 @@
+import time
+
+import pytest
+import requests
+
+from modules import pokeapi_module
+from modules.pokeapi_module import NotFound, UpstreamClient, UpstreamError
+from modules.resilience_module import CircuitBreaker
+
+PIKACHU = {
+    "name": "pikachu", "id": 25, "height": 4, "weight": 60, "base_experience": 112,
+    "types": [{"type": {"name": "electric"}}],
+    "abilities": [{"ability": {"name": "static"}}],
+    "stats": [{"base_stat": 35, "effort": 0, "stat": {"name": "hp"}}],
+}
+
+
+def make_response(status, body=b"{}", content_type="application/json"):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers["Content-Type"] = content_type
+    response.url = "http://upstream.test/"
+    return response
+
+
+class FakeSession:
+    """Plays back responses (or raises exceptions) in order"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_client(*outcomes, retries=0, threshold=1, reset=0.05):
+    client = UpstreamClient("http://upstream.test", retries=retries, backoff=0,
+                            breaker_threshold=threshold, breaker_reset=reset)
+    client.session = FakeSession(*outcomes)
+    return client
+
+
+def json_response(data):
+    import json
+    return make_response(200, json.dumps(data).encode())
+
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.ChunkedEncodingError("truncated"),
+    requests.exceptions.ContentDecodingError("bad gzip"),
+    requests.exceptions.TooManyRedirects("loop"),
+    requests.exceptions.InvalidURL("bad url"),
+])
+def test_any_requests_error_is_an_upstream_failure(error):
+    client = make_client(error)
+    with pytest.raises(UpstreamError):
+        client.request("GET", "pokemon/pikachu")
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_trial_failure_does_not_wedge_the_breaker():
+    client = make_client(requests.exceptions.ConnectionError("down"))
+    with pytest.raises(UpstreamError):
+        client.request("GET", "pokemon/pikachu")
+    time.sleep(0.06)
+
+    client.session = FakeSession(requests.exceptions.ChunkedEncodingError("truncated"))
+    with pytest.raises(UpstreamError) as e:
+        client.request("GET", "pokemon/pikachu")
+    assert e.value.kind != "circuit_open"
+
+    time.sleep(0.06)
+    client.session = FakeSession(json_response(PIKACHU))
+    assert client.get_json("pokemon/pikachu")["name"] == "pikachu"
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unexpected_exception_releases_the_trial_slot():
+    client = make_client(requests.exceptions.ConnectionError("down"))
+    with pytest.raises(UpstreamError):
+        client.request("GET", "pokemon/pikachu")
+    time.sleep(0.06)
+
+    client.session = FakeSession(RuntimeError("bug"))
+    with pytest.raises(RuntimeError):
+        client.request("GET", "pokemon/pikachu")
+    client.session = FakeSession(json_response(PIKACHU))
+    assert client.get_json("pokemon/pikachu")["name"] == "pikachu"
+
+
+def test_retries_then_succeeds():
+    client = make_client(make_response(503), json_response(PIKACHU), retries=2)
+    assert client.get_json("pokemon/pikachu")["name"] == "pikachu"
+    assert client.retried == 1
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_not_found_is_not_a_failure():
+    client = make_client(make_response(404))
+    with pytest.raises(NotFound):
+        client.request("GET", "pokemon/missingno")
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_json_body_is_a_bad_response():
+    client = make_client(make_response(200, b"<html>Down for maintenance</html>", "text/html"))
+    with pytest.raises(UpstreamError) as e:
+        client.get_json("pokemon/pikachu")
+    assert e.value.kind == "bad_response"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Point the module's fetchers at a client playing back the given outcomes"""
+    def install(*outcomes):
+        client = make_client(*outcomes, threshold=5)
+        monkeypatch.setattr(pokeapi_module, "pokeapi", client)
+        return client
+    return install
+
+
+def test_fetch_pokemon(upstream):
+    upstream(json_response(PIKACHU))
+    record = pokeapi_module.fetch_pokemon("Pikachu")
+    assert record["types"] == ["electric"]
+    assert record["stats"] == [{"base_stat": 35, "effort": 0, "stat": {"name": "hp"}}]
+
+
+@pytest.mark.parametrize("response", [
+    make_response(200, b"<html>Down for maintenance</html>", "text/html"),
+    make_response(200, b'{"name": "pikachu"}'),
+    make_response(200, b"[]"),
+    make_response(500),
+])
+def test_fetch_pokemon_bad_upstream_returns_none(upstream, response):
+    upstream(response)
+    assert pokeapi_module.fetch_pokemon("pikachu") is None
+
+
+def test_fetch_pokemon_list(upstream):
+    upstream(json_response({"results": [{"name": "bulbasaur", "url": "u"}]}))
+    assert pokeapi_module.fetch_pokemon_list(1) == [{"name": "bulbasaur", "url": "u"}]
+
+
+@pytest.mark.parametrize("response", [
+    make_response(200, b"<html>Down for maintenance</html>", "text/html"),
+    make_response(200, b"[]"),
+    make_response(200, b'{"results": [{"url": "u"}]}'),
+    make_response(200, b'{"count": 0}'),
+])
+def test_fetch_pokemon_list_bad_upstream_returns_empty(upstream, response):
+    upstream(response)
+    assert pokeapi_module.fetch_pokemon_list(1) == []
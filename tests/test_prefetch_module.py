@@ -0,0 +1,36 @@
+from modules import prefetch_module
+from modules.prefetch_module import prefetch_pokemon
+
+
+class NoPool:
+    def __init__(self, *args, **kwargs):
+        raise AssertionError("started a thread pool")
+
+
+def test_cache_hits_are_read_without_a_pool(data_layer, stub, monkeypatch):
+    names = ["pikachu", "charizard", "gyarados"]
+    prefetch_pokemon(names)
+    served = stub[0].request_count
+    monkeypatch.setattr(prefetch_module, "ThreadPoolExecutor", NoPool)
+    progress = []
+    result = prefetch_pokemon(names, progress=lambda *args: progress.append(args))
+    assert sorted(result["records"]) == sorted(names)
+    assert progress == [(i, 3, name, True) for i, name in enumerate(names, 1)]
+    assert stub[0].request_count == served
+
+
+def test_single_miss_is_loaded_inline(data_layer, monkeypatch):
+    prefetch_pokemon(["pikachu"])
+    monkeypatch.setattr(prefetch_module, "ThreadPoolExecutor", NoPool)
+    result = prefetch_pokemon(["pikachu", "gengar"])
+    assert sorted(result["records"]) == ["gengar", "pikachu"]
+    assert prefetch_pokemon(["notapokemon"])["failed"] == ["notapokemon"]
+
+
+def test_misses_are_loaded_concurrently(data_layer):
+    progress = []
+    result = prefetch_pokemon(["pikachu", "onix", "notapokemon", "pikachu"],
+                              progress=lambda *args: progress.append(args))
+    assert sorted(result["records"]) == ["onix", "pikachu"]
+    assert result["failed"] == ["notapokemon"]
+    assert sorted(p[0] for p in progress) == [1, 2, 3]
@@ -0,0 +1,71 @@
+import pytest
+
+from bench.bench_parser import load_corpus
+from bench.stub_pokeapi import load_fixtures
+from modules.query_module import DEFAULT_COUNT, FALLBACK_POKEMON_NAMES, QueryParser
+
+CORPUS = load_corpus()
+NAMES = [p["name"] for p in load_fixtures()] + ["mew", "articuno", "zapdos", "moltres",
+                                                "mr-mime", "ho-oh", "porygon-z", "farfetch'd"]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return QueryParser(NAMES)
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[case["query"] for case in CORPUS])
+def test_corpus(parser, case):
+    assert dict(parser.parse(case["query"].lower())) == case["expected"]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("3 tanks 3 tanks", {"tank": 6}),
+    ("10 attackers", {"attacker": 10}),
+    ("2 special attackers and 1 physical attacker", {"special attacker": 2, "physical attacker": 1}),
+    ("2 special pokemon", {}),
+    ("3", {}),
+    ("team 4", {}),
+])
+def test_counts(parser, query, expected):
+    assert dict(parser.parse(query)) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("an attacking team", {"attacker": DEFAULT_COUNT}),
+    ("tanky and supportive", {"tank": DEFAULT_COUNT}),
+    ("supportive friends", {"support": DEFAULT_COUNT}),
+    ("defensive steel team", {"steel": DEFAULT_COUNT}),
+    ("attack with fire and water", {"attacker": DEFAULT_COUNT, "fire": DEFAULT_COUNT}),
+    ("a fire-type team", {"fire": DEFAULT_COUNT}),
+    ("fireworks", {}),
+])
+def test_role_stems_and_types_without_counts(parser, query, expected):
+    assert dict(parser.parse(query)) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("3 fire type pokemon and 3 water types", {"fire": 3, "water": 3}),
+    ("2 grass pokémon 4 ice", {"grass": 2, "ice": 4}),
+    ("2 fire-type 1 type", {"fire": 2}),
+    ("4 psychic types types 2 dark", {"psychic": 4, "dark": 2}),
+])
+def test_filler_words(parser, query, expected):
+    assert dict(parser.parse(query)) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("mr-mime and 2 tanks", {"mr-mime": 1, "tank": 2}),
+    ("mr mime and porygon z", {"mr-mime": 1, "porygon-z": 1}),
+    ("ho-oh with 5 fire", {"ho-oh": 1, "fire": 5}),
+    ("farfetch'd", {"farfetch'd": 1}),
+    ("mr", {}),
+])
+def test_hyphenated_names(parser, query, expected):
+    assert dict(parser.parse(query)) == expected
+
+
+def test_fallback_names():
+    parser = QueryParser()
+    assert dict(parser.parse("pikachu and snorlax")) == {"pikachu": 1}
+    assert "pikachu" in FALLBACK_POKEMON_NAMES
@@ -0,0 +1,45 @@
+import time
+
+from modules.resilience_module import CircuitBreaker, TokenBucket
+
+
+def test_breaker_opens_after_threshold_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()          # the half-open trial
+    assert not breaker.allow()      # only one at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_released_trial_can_be_retried():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_token_bucket_rejects_beyond_timeout():
+    bucket = TokenBucket(rate=1, burst=1)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0)
+    assert bucket.stats()["rejected"] == 1
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from bench.stub_pokeapi import load_fixtures
+from modules import roster_module
+from modules.data_module import STAT_NAMES
+from modules.pokeapi_module import slim_pokemon
+from modules.roster_module import (DEFAULT_ROLE_THRESHOLDS, RosterIndex, classify_roles, determine_pokemon_role,
+                                   make_member, set_role_thresholds, stat_vector)
+
+RECORDS = [slim_pokemon(p) for p in load_fixtures()]
+COLUMNS = {"hp": 0, "attack": 1, "defense": 2, "sp_attack": 3, "sp_defense": 4, "speed": 5}
+
+
+def cascade_role(stats, t=DEFAULT_ROLE_THRESHOLDS):
+    """The original per-Pokemon if/elif cascade, with its numbers read from t"""
+    hp, attack, defense, sp_attack, sp_defense, speed = (int(s) for s in stats)
+    total_def = defense + sp_defense + hp
+    total_att = attack + sp_attack
+    if (hp > t["tank_hp"] and defense > t["tank_defense"]) or total_def > t["tank_bulk"]:
+        return "tank"
+    elif sp_attack > t["special_attack"] or (sp_attack > attack and sp_attack > t["special_attack_lead"]):
+        return "special attacker"
+    elif attack > t["physical_attack"] or (attack > sp_attack and attack > t["physical_attack_lead"]):
+        return "physical attacker"
+    elif ((total_att > t["attacker_total"] and speed > t["attacker_speed"])
+          or (attack > t["attacker_both"] and sp_attack > t["attacker_both"])):
+        return "attacker"
+    elif hp > t["support_hp"] or (defense + sp_defense > t["support_defenses"] and total_att < t["support_max_attack"]):
+        return "support"
+    return "balanced"
+
+
+def boundary_stats():
+    """Stat lines sitting on, just below and just above every threshold"""
+    t = DEFAULT_ROLE_THRESHOLDS
+    rows = []
+
+    def vary(**fixed):
+        # Everything else at 40, well under every threshold
+        for delta in (-1, 0, 1):
+            row = [40] * len(STAT_NAMES)
+            for column, value in fixed.items():
+                row[COLUMNS[column]] = value + delta
+            rows.append(row)
+
+    vary(hp=t["tank_hp"] + 1, defense=t["tank_defense"])
+    vary(hp=t["tank_hp"], defense=t["tank_defense"] + 1)
+    vary(hp=t["tank_bulk"] - 80, defense=40, sp_defense=40)
+    vary(sp_attack=t["special_attack"])
+    vary(sp_attack=t["special_attack_lead"])
+    vary(attack=t["physical_attack"])
+    vary(attack=t["physical_attack_lead"])
+    vary(attack=t["attacker_total"] // 2, sp_attack=t["attacker_total"] - t["attacker_total"] // 2,
+         speed=t["attacker_speed"] + 1)
+    vary(speed=t["attacker_speed"], attack=65, sp_attack=65)
+    vary(attack=t["attacker_both"], sp_attack=t["attacker_both"])
+    vary(hp=t["support_hp"])
+    vary(defense=t["support_defenses"] // 2, sp_defense=t["support_defenses"] - t["support_defenses"] // 2)
+    vary(defense=61, sp_defense=61, attack=t["support_max_attack"] // 2,
+         sp_attack=t["support_max_attack"] - t["support_max_attack"] // 2)
+    # Ties between the two attacks
+    rows += [[40, a, 40, a, 40, 40] for a in (69, 70, 71, 90, 91)]
+    return rows
+
+
+def test_matches_cascade_on_fixtures():
+    stats = [stat_vector({s["stat"]["name"]: s["base_stat"] for s in r["stats"]}) for r in RECORDS]
+    expected = [cascade_role(row) for row in stats]
+    assert classify_roles(stats) == expected
+    assert [determine_pokemon_role(r) for r in RECORDS] == expected
+
+
+def test_matches_cascade_at_every_threshold():
+    rows = boundary_stats()
+    roles = classify_roles(rows)
+    for row, role in zip(rows, roles):
+        assert role == cascade_role(row), row
+    # The boundaries really do land on different sides of the cascade
+    assert len(set(roles)) == 6
+
+
+def test_matches_cascade_on_random_stats():
+    rows = np.random.default_rng(0).integers(1, 160, size=(5000, len(STAT_NAMES)))
+    assert classify_roles(rows) == [cascade_role(row) for row in rows]
+
+
+def test_custom_thresholds_are_used():
+    thresholds = dict(DEFAULT_ROLE_THRESHOLDS, tank_hp=30, tank_defense=30)
+    rows = boundary_stats()
+    assert classify_roles(rows, thresholds) == [cascade_role(row, thresholds) for row in rows]
+    assert classify_roles(rows, thresholds) != classify_roles(rows)
+
+
+def test_determine_role_without_stats():
+    assert determine_pokemon_role(None) == "balanced"
+    assert determine_pokemon_role({"name": "missingno"}) == "balanced"
+
+
+def test_set_role_thresholds_recomputes_the_index(monkeypatch):
+    index = RosterIndex([make_member(r) for r in RECORDS])
+    monkeypatch.setattr(roster_module, "_index", index)
+    monkeypatch.setattr(roster_module, "role_thresholds", dict(DEFAULT_ROLE_THRESHOLDS))
+    assert index.roles["pikachu"] != "tank"
+
+    merged = set_role_thresholds({"tank_hp": 0, "tank_defense": 0})
+    assert merged["tank_bulk"] == DEFAULT_ROLE_THRESHOLDS["tank_bulk"]
+    assert roster_module.role_thresholds == merged
+    assert set(index.roles.values()) == {"tank"}
+    assert index.candidates("tank") == index.order
+    assert determine_pokemon_role(RECORDS[0]) == "tank"
+
+    with pytest.raises(ValueError):
+        set_role_thresholds({"tank_hpp": 1})
+    assert roster_module.role_thresholds == merged
+
+
+def test_thresholds_from_env(monkeypatch, tmp_path):
+    monkeypatch.setattr(roster_module, "ROLE_THRESHOLDS_PATH", str(tmp_path / "role_thresholds.json"))
+    (tmp_path / "role_thresholds.json").write_text('{"tank_hp": 10, "support_hp": 20}')
+    monkeypatch.setenv("ROLE_THRESHOLDS", '{"support_hp": 30}')
+    thresholds = roster_module.load_role_thresholds()
+    assert (thresholds["tank_hp"], thresholds["support_hp"]) == (10, 30)
+    monkeypatch.setenv("ROLE_THRESHOLDS", '{"nope": 1}')
+    with pytest.raises(ValueError):
+        roster_module.load_role_thresholds()
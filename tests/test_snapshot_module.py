@@ -0,0 +1,97 @@
+import pytest
+
+from bench.stub_pokeapi import load_fixtures
+from modules.pokeapi_module import slim_pokemon
+from modules.snapshot_module import NO_EXPERIENCE, Snapshot, write_snapshot
+
+FIXTURES = [slim_pokemon(p) for p in load_fixtures()]
+ROSTER = [r["name"] for r in FIXTURES]
+
+
+@pytest.fixture
+def snapshot_file(tmp_path):
+    """Write records/roster to a snapshot file and map it; closed after the test"""
+    opened = []
+
+    def make(records=FIXTURES, roster=ROSTER, roster_limit=None):
+        path = str(tmp_path / "pokemon_snapshot.bin")
+        write_snapshot(path, records, roster, roster_limit)
+        opened.append(Snapshot(path))
+        return opened[-1]
+
+    yield make
+    for snapshot in opened:
+        snapshot.close()
+
+
+def test_round_trips_every_record(snapshot_file):
+    snapshot = snapshot_file()
+    assert len(snapshot) == len(FIXTURES)
+    for record in FIXTURES:
+        assert snapshot.get(record["name"]) == record
+
+
+def test_find_uses_name_order_not_id_order(snapshot_file):
+    snapshot = snapshot_file()
+    for record in FIXTURES:
+        assert snapshot.name(snapshot.find(record["name"])) == record["name"]
+    # Before the first, after the last and between two names
+    for name in ("a", "zzz", "charmandez", "pikachu2", ""):
+        assert snapshot.find(name) is None
+        assert snapshot.get(name) is None
+
+
+def test_dual_types_keep_their_order(snapshot_file):
+    snapshot = snapshot_file()
+    # The second type sorts before the first in TYPES for all three
+    assert snapshot.get("bulbasaur")["types"] == ["grass", "poison"]
+    assert snapshot.get("gyarados")["types"] == ["water", "flying"]
+    assert snapshot.get("onix")["types"] == ["rock", "ground"]
+
+
+def test_missing_base_experience(snapshot_file):
+    record = dict(FIXTURES[0], name="missingno", id=10001, base_experience=None)
+    snapshot = snapshot_file([record], ["missingno"])
+    assert int(snapshot.rows[0]["base_experience"]) == NO_EXPERIENCE
+    assert snapshot.get("missingno")["base_experience"] is None
+    assert snapshot.get("missingno") == record
+
+
+def test_empty_snapshot(snapshot_file):
+    snapshot = snapshot_file([], [])
+    assert len(snapshot) == 0
+    assert snapshot.roster() == []
+    assert snapshot.get("pikachu") is None
+
+
+def test_roster_order_and_limit(snapshot_file):
+    roster = list(reversed(ROSTER)) + ["notapokemon"]
+    snapshot = snapshot_file(roster=roster, roster_limit=151)
+    assert snapshot.roster() == list(reversed(ROSTER))
+    assert snapshot.roster(3) == list(reversed(ROSTER))[:3]
+    assert snapshot.roster_limit == 151
+
+
+def test_version_depends_only_on_content(tmp_path):
+    first = write_snapshot(str(tmp_path / "a.bin"), FIXTURES, ROSTER)
+    second = write_snapshot(str(tmp_path / "b.bin"), list(reversed(FIXTURES)), ROSTER)
+    changed = write_snapshot(str(tmp_path / "c.bin"), FIXTURES[1:], ROSTER)
+    assert first == second != changed
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_snapshot.bin"
+    path.write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
+
+
+def test_data_layer_serves_from_snapshot(data_layer, stub, snapshot_file):
+    data_layer.set_snapshot(snapshot_file(roster_limit=len(ROSTER)))
+    try:
+        served = stub[0].request_count
+        assert data_layer.get_pokemon("Pikachu") == next(r for r in FIXTURES if r["name"] == "pikachu")
+        assert data_layer.get_pokemon_list(5) == [{"name": name} for name in ROSTER[:5]]
+        assert stub[0].request_count == served
+    finally:
+        data_layer.set_snapshot(None)
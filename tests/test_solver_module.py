@@ -0,0 +1,90 @@
+import pytest
+
+from bench.stub_pokeapi import load_fixtures
+from modules.pokeapi_module import slim_pokemon
+from modules.roster_module import RosterIndex, make_member
+from modules.solver_module import WEIGHT_REQUIREMENT, TeamSolver, score_team, solve_team
+from modules.team_module import _select_first_fit
+
+REQUIREMENTS = [
+    {"water": 2, "fire": 1},
+    {"tank": 2, "electric": 1},
+    {"attacker": 3, "grass": 1, "pikachu": 1},
+    {"psychic": 1, "dragon": 1, "balanced": 6},
+    {},
+]
+
+
+@pytest.fixture(scope="module")
+def roster():
+    return RosterIndex([make_member(slim_pokemon(p)) for p in load_fixtures()])
+
+
+def first_fit(roster, requirements, team_size=6):
+    return [member["name"] for member, _ in _select_first_fit(roster, requirements, team_size)]
+
+
+def assert_valid(roster, names, team_size):
+    assert len(names) == min(team_size, len(roster))
+    assert len(set(names)) == len(names)
+    assert all(name in roster.by_name for name in names)
+
+
+@pytest.mark.parametrize("requirements", REQUIREMENTS)
+def test_satisfies_requirements_when_the_roster_allows(roster, requirements):
+    names, score = solve_team(roster, requirements)
+    assert_valid(roster, names, 6)
+    for requirement, count in requirements.items():
+        available = len(roster.candidates(requirement))
+        picked = sum(name in roster.candidates(requirement) for name in names)
+        # Every slot a requirement can fill within the team size is filled
+        assert picked >= min(count, available, 6), requirement
+    assert score == pytest.approx(score_team(roster, requirements, names))
+
+
+def test_requirements_outweigh_everything_else(roster):
+    # One requirement slot is worth more than the best coverage and stats a team can add
+    assert WEIGHT_REQUIREMENT > score_team(roster, {}, roster.strongest()[:6])
+    names, _ = solve_team(roster, {"pikachu": 1, "onix": 1})
+    assert {"pikachu", "onix"} <= set(names)
+
+
+@pytest.mark.parametrize("requirements", REQUIREMENTS)
+def test_zero_budget_still_returns_a_full_team(roster, requirements):
+    names, score = solve_team(roster, requirements, budget_ms=0)
+    assert_valid(roster, names, 6)
+    assert score == pytest.approx(score_team(roster, requirements, names))
+
+
+def test_roster_smaller_than_team(roster):
+    small = RosterIndex([roster.by_name[name] for name in roster.order[:4]])
+    names, _ = solve_team(small, {"fire": 2})
+    assert sorted(names) == sorted(small.order)
+
+
+def test_empty_roster():
+    assert solve_team(RosterIndex([]), {"water": 1}) == ([], 0.0)
+
+
+@pytest.mark.parametrize("requirements", REQUIREMENTS)
+@pytest.mark.parametrize("budget_ms, beam_width", [(None, None), (0, None), (None, 1)])
+def test_never_worse_than_first_fit(roster, requirements, budget_ms, beam_width):
+    baseline = first_fit(roster, requirements)
+    names, score = solve_team(roster, requirements, budget_ms=budget_ms, beam_width=beam_width, fallback=baseline)
+    assert_valid(roster, names, 6)
+    assert score >= score_team(roster, requirements, baseline)
+
+
+def test_search_alone_beats_first_fit_on_the_fixture_roster(roster):
+    for requirements in REQUIREMENTS:
+        names, score = TeamSolver(roster, requirements).solve()
+        assert score >= score_team(roster, requirements, first_fit(roster, requirements)), requirements
+
+
+def test_fallback_wins_when_it_scores_higher(roster, monkeypatch):
+    weakest = list(reversed(roster.strongest()))[:6]
+    monkeypatch.setattr(TeamSolver, "solve", lambda self, budget_ms=None, beam_width=None: (weakest, -1.0))
+    baseline = first_fit(roster, {"water": 2})
+    names, score = solve_team(roster, {"water": 2}, fallback=baseline)
+    assert names == baseline
+    assert score == score_team(roster, {"water": 2}, baseline)
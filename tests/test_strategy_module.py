@@ -0,0 +1,71 @@
+import pytest
+
+from modules import roster_module
+from modules.roster_module import COUNTER_DEPTH
+from modules.strategy_module import analyze_team, find_counters
+from modules.type_module import TYPES
+
+FLYERS = ["charizard", "gyarados", "dragonite"]
+
+
+@pytest.fixture
+def roster_index(data_layer, monkeypatch):
+    """Roster index rebuilt from the stub for each test"""
+    monkeypatch.setattr(roster_module, "_index", None)
+    return roster_module.get_roster_index()
+
+
+def test_analyze_team_shared_weaknesses(data_layer):
+    result = analyze_team(FLYERS)
+    shared = {entry["type"]: entry["members"] for entry in result["shared_weaknesses"]}
+    assert shared["rock"] == FLYERS
+    assert shared["electric"] == ["charizard", "gyarados"]
+    assert "ice" not in shared  # only dragonite; fire and water cancel flying's weakness
+    # Most-shared first
+    assert result["shared_weaknesses"][0]["type"] == "rock"
+    assert "rock" in result["uncovered_threats"]
+
+
+def test_analyze_team_counts_immunity_as_resistance(data_layer):
+    result = analyze_team(FLYERS + ["gengar"])
+    assert result["resistances"]["ground"] == FLYERS
+    assert result["resistances"]["normal"] == ["gengar"]
+    assert "ground" not in result["uncovered_threats"]
+
+
+def test_analyze_team_normalizes_and_reports_not_found(data_layer):
+    result = analyze_team(["Pikachu ", "pikachu", "notapokemon"])
+    assert [p["name"] for p in result["pokemon"]] == ["pikachu"]
+    assert result["not_found"] == ["notapokemon"]
+    assert "error" in analyze_team(["notapokemon"])
+
+
+def test_analyze_team_coverage(data_layer):
+    result = analyze_team(["pikachu", "squirtle"])
+    assert result["offensive_coverage"]["water"] == ["pikachu"]
+    assert result["offensive_coverage"]["fire"] == ["squirtle"]
+    # Covered and not covered split the 18 types
+    assert sorted(set(result["offensive_coverage"]) | set(result["not_covered"])) == sorted(TYPES)
+    assert not set(result["offensive_coverage"]) & set(result["not_covered"])
+
+
+def test_find_counters_excludes_the_target(roster_index):
+    result = find_counters("gyarados", k=5)
+    names = [c["name"] for c in result["counters"]]
+    assert len(names) == 5
+    assert "gyarados" not in names
+    assert "electric" in result["counters"][0]["types"]
+    assert result["weak_to"][0] == "electric"
+
+
+@pytest.mark.parametrize("k, expected", [(0, 1), (-3, 1), (1, 1), (10**6, None)])
+def test_find_counters_clamps_k(roster_index, k, expected):
+    counters = find_counters("pikachu", k=k)["counters"]
+    if expected is None:
+        # Capped at COUNTER_DEPTH, and at the rest of the roster
+        expected = min(COUNTER_DEPTH, len(roster_index) - 1)
+    assert len(counters) == expected
+
+
+def test_find_counters_unknown_pokemon(roster_index):
+    assert "error" in find_counters("notapokemon")
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from modules.strategy_module import calculate_type_advantages, strategy_from_infos
+from modules.type_module import (IMMUNE_SCORE, TYPES, effectiveness, encode_many, matchup_score, matchup_scores,
+                                 matchup_table, super_effective_types, type_score)
+
+
+@pytest.mark.parametrize("attack, defender, multiplier, score", [
+    ("water", "fire", 2.0, 1),
+    ("fire", "water", 0.5, -1),
+    ("normal", "ghost", 0.0, IMMUNE_SCORE),
+    ("ground", "flying", 0.0, IMMUNE_SCORE),
+    ("dragon", "fairy", 0.0, IMMUNE_SCORE),
+    ("electric", "normal", 1.0, 0),
+])
+def test_chart_entries(attack, defender, multiplier, score):
+    assert effectiveness(attack, [defender]) == multiplier
+    assert type_score(attack, defender) == score
+
+
+def test_dual_type_immunity_overrides_weakness():
+    # 2x on fire, 0x on flying
+    assert effectiveness("ground", ["fire", "flying"]) == 0.0
+    assert matchup_score(["ground"], ["fire", "flying"]) == IMMUNE_SCORE
+    assert matchup_score(["ground"], ["fire", "flying"]) < matchup_score(["ground"], ["grass"])
+
+
+def test_double_weakness_and_double_resistance():
+    assert effectiveness("ice", ["dragon", "flying"]) == 4.0
+    assert matchup_score(["ice"], ["dragon", "flying"]) == 2
+    assert effectiveness("fire", ["water", "dragon"]) == 0.25
+    assert matchup_score(["fire"], ["water", "dragon"]) == -2
+    # 2x and 0.5x cancel out
+    assert matchup_score(["water"], ["fire", "water"]) == 0
+
+
+def test_attacking_types_are_summed():
+    assert matchup_score(["water", "ground"], ["fire"]) == 2
+    # 0x from ground, 2x from water
+    assert matchup_score(["ground", "water"], ["fire", "flying"]) == IMMUNE_SCORE + 1
+
+
+def test_vectorized_scores_match_single_pairs():
+    typings = [[t] for t in TYPES] + [["fire", "flying"], ["water", "ground"], ["ghost", "poison"], ["dragon", "flying"]]
+    table = matchup_table(typings, typings)
+    assert table.shape == (len(typings), len(typings))
+    for i, attacker in enumerate(typings):
+        for j, defender in enumerate(typings):
+            assert table[i, j] == matchup_score(attacker, defender)
+
+    defenders = list(reversed(typings))
+    scores = matchup_scores(typings, defenders)
+    assert scores.shape == (len(typings),)
+    assert scores.tolist() == [matchup_score(a, d) for a, d in zip(typings, defenders)]
+    np.testing.assert_array_equal(matchup_scores(encode_many(typings), encode_many(defenders)), scores)
+
+
+def test_empty_batches():
+    assert matchup_scores([], []).shape == (0,)
+    assert matchup_table([], [["fire"]]).shape == (0, 1)
+
+
+def test_super_effective_types_strongest_first():
+    assert super_effective_types(["dragon", "flying"])[0] == "ice"
+    assert "ground" not in super_effective_types(["fire", "flying"])
+
+
+def test_strategy_uses_combined_multipliers():
+    # The old per-pair sum scored ground on fire/flying +1 - 2 = -1, a plain resist
+    assert calculate_type_advantages(["ground"], ["fire", "flying"]) == IMMUNE_SCORE
+    result = strategy_from_infos({"name": "sandslash", "types": ["ground"]},
+                                 {"name": "charizard", "types": ["fire", "flying"]})
+    assert result["winner"] == "charizard"
+    assert (result["score1"], result["score2"]) == (IMMUNE_SCORE, 0)